@@ -1,21 +1,35 @@
+import json
 import random
 import copy
+import time
+from collections import namedtuple
 # Version: 1.0 (SmartBot Base)
-# Avoid circular import from tetris_controller by defining actions locally
-# Actions (Mirrored)
-ACTION_NONE = 0
-ACTION_LEFT = 1
-ACTION_RIGHT = 2
-ACTION_DOWN = 3 
-ACTION_DROP = 4 
-ACTION_ROTATE_R = 5
-ACTION_ROTATE_L = 6
-ACTION_HOLD = 7
-
-# Constants
-GRID_WIDTH = 10
-GRID_HEIGHT = 20
-TOTAL_HEIGHT = 40 
+# Actions and board constants come from the pygame-free core
+from tetris_core import (ACTION_NONE, ACTION_LEFT, ACTION_RIGHT, ACTION_DOWN, ACTION_DROP,
+                         ACTION_ROTATE_R, ACTION_ROTATE_L, ACTION_HOLD,
+                         GRID_WIDTH, GRID_HEIGHT, TOTAL_HEIGHT, FULL_ROW)
+from piece_tables import CELLS, PLACED_ROWS, MIN_X, MAX_X
+from movegen import MoveGenerator
+from zobrist import ROW_KEYS, TranspositionTable, hash_rows
+
+PREVIEW_SIZE = 5 # Pieces of game.bag visible in the NEXT panel
+
+# Outcome of SmartBot.search: the plan, its heuristic value, the depth of the
+# deepest search that finished, placements evaluated and whether it reached self.depth
+SearchResult = namedtuple('SearchResult', ['moves', 'value', 'depth', 'nodes', 'complete'])
+
+# Heuristic weights of SmartBot (attributes of the same name)
+WEIGHT_NAMES = ('w_lines', 'w_height', 'w_holes', 'w_bumpiness', 'w_max_height')
+
+def load_weights(path):
+    """Reads SmartBot weights from a JSON config ({"weights": {name: value}}, as written by tuning.py)."""
+    with open(path) as f:
+        config = json.load(f)
+    weights = config.get('weights', config)
+    unknown = set(weights) - set(WEIGHT_NAMES)
+    if unknown:
+        raise ValueError(f"{path}: unknown weights {sorted(unknown)}")
+    return {name: float(weights[name]) for name in WEIGHT_NAMES if name in weights}
 
 class TetrisBot:
     def __init__(self):
@@ -38,24 +52,149 @@ class RandomBot(TetrisBot):
         return moves
 
 class SmartBot(TetrisBot):
+    """
+    Heuristic bot.
+    With the defaults (depth=1, beam_width=1, use_hold=False) it is the greedy
+    one-piece search. Otherwise it runs a beam search over the current piece,
+    the visible NEXT queue and the hold slot:
+      depth       -- pieces looked ahead (current piece counts as 1)
+      beam_width  -- best states kept after each piece (pruned by the heuristic)
+      use_hold    -- also try swapping with hold at every ply
+      node_budget -- max placements evaluated per move (None = unlimited);
+                     the first ply is always searched completely.
+      batch_eval  -- beam search: score the new boards of a whole ply in one
+                     NumPy pass (batch_eval.BatchEvaluator; requires numpy).
+                     Same plans. Halves the scoring time, but move generation
+                     takes ~85% of a search, so off by default.
+      transposition_table -- zobrist.TranspositionTable for board evaluations
+                     (pass one in to share it between bots; default: a private one).
+                     Entries are keyed by board and weights, so bots with
+                     different weights can share one without mixing scores.
+      time_budget -- ms per move (None = unlimited). The search deepens one
+                     piece at a time and returns the plan of the deepest
+                     search that finished in time (see search()). The clock
+                     is checked between move generations and placements, so
+                     a move can overrun by one move generation (~2 ms).
+      weights     -- heuristic weights overriding the defaults: a dict of
+                     WEIGHT_NAMES or the path of a JSON config (see load_weights).
+    """
+    def __init__(self, beam_width=1, depth=1, use_hold=False, node_budget=None, batch_eval=False,
+                 transposition_table=None, time_budget=None, weights=None):
+        super().__init__()
+        self.beam_width = beam_width
+        self.depth = depth
+        self.use_hold = use_hold
+        self.node_budget = node_budget
+        self.time_budget = time_budget
+        
+        # Weights (Tuned for standard AI)
+        self.w_lines = 1000
+        self.w_height = -5
+        self.w_holes = -50 # Holes are very bad
+        self.w_bumpiness = -5
+        self.w_max_height = -5 # Panic when high
+        if weights is not None:
+            if isinstance(weights, str):
+                weights = load_weights(weights)
+            for name, value in weights.items():
+                if name not in WEIGHT_NAMES:
+                    raise ValueError(f"unknown weight {name!r}")
+                setattr(self, name, value)
+        
+        self.batch_evaluator = None
+        if batch_eval:
+            from batch_eval import BatchEvaluator # Lazy: numpy is optional
+            self.batch_evaluator = BatchEvaluator(w_lines=self.w_lines, w_height=self.w_height, w_holes=self.w_holes,
+                                                  w_bumpiness=self.w_bumpiness, w_max_height=self.w_max_height)
+        
+        # Search state
+        self.movegen = MoveGenerator()
+        # Zobrist board hash ^ weights fingerprint -> static evaluation (kept across moves, bounded);
+        # the fingerprint keeps bots with different weights apart in a shared table
+        self.transpositions = transposition_table if transposition_table is not None else TranspositionTable(1 << 17)
+        self.table_salt = hash(tuple(self.get_weights().values())) & 0xFFFFFFFFFFFFFFFF
+        self.nodes = 0 # Placements evaluated by the last search
+        self.depth_reached = 0 # Pieces looked ahead by the last search
+        self.expansion_ms = 2.0 # Running mean of one uncached expansion (move generation + scoring)
+
+    def get_weights(self):
+        """The heuristic weights as a dict (the `weights` argument of another SmartBot)."""
+        return {name: getattr(self, name) for name in WEIGHT_NAMES}
+
     def get_moves(self, game):
+        return self.search(game).moves
+
+    def search(self, game, time_budget=None):
+        """
+        Anytime search. Without a time budget (ms, default self.time_budget) it
+        searches self.depth pieces at once. With one, it searches depth 1, 2, ...
+        and stops when the budget runs out: a deeper search that could not
+        finish in the time left (estimated from the one before) is not started,
+        one cut short is discarded, and the plan of the deepest finished one is
+        returned. If even depth 1 runs out of time, the best placement found so
+        far is played (depth 0); at least the current piece's placements are
+        searched for it, so a search overruns its budget by about one move
+        generation at most. `complete` is True only if self.depth (or the
+        whole visible queue) was searched.
+        """
+        if time_budget is None:
+            time_budget = self.time_budget
+        if self.depth <= 1 and self.beam_width <= 1 and not self.use_hold:
+            moves = self._greedy_moves(game)
+            self.nodes, self.depth_reached = 0, 1
+            return SearchResult(moves, None, 1, 0, True)
+
+        max_depth = min(self.depth, 1 + len(game.bag[:PREVIEW_SIZE]))
+        deadline = None
+        depths = [max_depth]
+        if time_budget is not None:
+            deadline = time.monotonic() + time_budget / 1000
+            depths = range(1, max_depth + 1)
+        self.nodes = 0
+        self.transpositions.new_search()
+        result = SearchResult([], None, 0, 0, False)
+        last = 0.0 # Seconds the previous depth took
+        for depth in depths:
+            started = time.monotonic()
+            if deadline is not None and depth > 1 and started + self._estimate(last) > deadline:
+                break # Could not finish in time: keep the shallower plan
+            found = self._beam_search(game, depth, deadline, partial=depth == 1)
+            if found is None:
+                if depth > 1:
+                    break # Out of time: keep the shallower plan
+                found = self._beam_search(game, 1) # No placement at all
+            last = time.monotonic() - started
+            moves, value, reached = found
+            result = SearchResult(moves, value, reached, self.nodes, reached >= max_depth)
+            if reached < depth:
+                break # Out of time, node budget exhausted or no pieces left
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+        self.depth_reached = result.depth
+        return result._replace(nodes=self.nodes)
+
+    def _estimate(self, last):
+        """
+        Seconds the next deeper search may take: the plies already searched
+        again (at most `last`, their moves are cached now) plus a full beam
+        expanded one piece further at the measured cost of an uncached expansion.
+        """
+        options = 2 if self.use_hold else 1
+        return last + self.beam_width * options * self.expansion_ms / 1000
+
+    def _greedy_moves(self, game):
         best_score = -float('inf')
         best_moves = []
         
-        # We need shapes data locally or from srs_data
-        from srs_data import SHAPES
-        
         piece_type = game.piece_type
         # Starting position of piece in game is usually (4, 20) or similar spawn point.
         # But we want to simulate ALL possible placements.
+        candidates = [] # (rot, x, y) of every final state
         
         # Try all rotations (0-3)
         for rot in range(4):
-            shape = SHAPES[piece_type][rot]
-            
-            # Try all horizontal positions (approx -2 to 9)
-            # Efficient range scanning based on piece width would be better, but fixed range is safe.
-            for x in range(-2, GRID_WIDTH + 2):
+            # Try all horizontal positions inside the walls (precompiled per rotation)
+            for x in range(MIN_X[piece_type][rot], MAX_X[piece_type][rot] + 1):
                 
                 # Check if this X/Rot is valid at a high Y (spawn area)
                 # We start simulation from Y=BUFFER_HEIGHT (20) to find drop point.
@@ -65,13 +204,13 @@ class SmartBot(TetrisBot):
                 start_y = 0 
                 # Find the highest non-colliding Y for this X,Rot
                 # If even the top is colliding, this X,Rot is invalid.
-                if self._check_collision(game.grid, shape, x, start_y):
+                if self._check_collision(game.rows, piece_type, rot, x, start_y):
                      # Try a bit lower if spawn is blocked? usually spawn is open.
                      # If spawn is blocked, game is over anyway.
                      # Let's try searching down a bit just in case.
                      valid_start = False
                      for zy in range(start_y, start_y + 4):
-                         if not self._check_collision(game.grid, shape, x, zy):
+                         if not self._check_collision(game.rows, piece_type, rot, x, zy):
                              start_y = zy
                              valid_start = True
                              break
@@ -80,124 +219,300 @@ class SmartBot(TetrisBot):
 
                 # Drop until collision
                 y = start_y
-                while not self._check_collision(game.grid, shape, x, y + 1):
+                while not self._check_collision(game.rows, piece_type, rot, x, y + 1):
                     y += 1
                 
                 # 'y' is now the placement height.
+                candidates.append((rot, x, y))
+        
+        # Evaluate the final states (a few dozen: too few to pay for a NumPy pass)
+        scores = [self._evaluate_board(game, piece_type, rot, x, y) for rot, x, y in candidates]
+        
+        for (rot, x, y), score in zip(candidates, scores):
+            if score > best_score:
+                best_score = score
+                # Reconstruct moves from CURRENT game state to target (x, rot)
+                # Note: Pathfinding is complex (SRS kicks). 
+                # We assume simplified movement: Rotate -> Move X -> Drop
+                best_moves = []
+                
+                # 1. Rotations
+                # We assume we can rotate freely at start.
+                current_rot = game.piece_rot
+                dr = (rot - current_rot) % 4
+                if dr == 1: best_moves.append(ACTION_ROTATE_R)
+                elif dr == 2: best_moves.extend([ACTION_ROTATE_R, ACTION_ROTATE_R])
+                elif dr == 3: best_moves.append(ACTION_ROTATE_L)
                 
-                # Evaluate this final state
-                score = self._evaluate_board(game.grid, shape, x, y)
+                # 2. Horizontal Move
+                dx = x - game.piece_x
+                if dx < 0:
+                    for _ in range(abs(dx)): best_moves.append(ACTION_LEFT)
+                elif dx > 0:
+                    for _ in range(dx): best_moves.append(ACTION_RIGHT)
                 
-                if score > best_score:
-                    best_score = score
-                    # Reconstruct moves from CURRENT game state to target (x, rot)
-                    # Note: Pathfinding is complex (SRS kicks). 
-                    # We assume simplified movement: Rotate -> Move X -> Drop
-                    best_moves = []
-                    
-                    # 1. Rotations
-                    # We assume we can rotate freely at start.
-                    current_rot = game.piece_rot
-                    dr = (rot - current_rot) % 4
-                    if dr == 1: best_moves.append(ACTION_ROTATE_R)
-                    elif dr == 2: best_moves.extend([ACTION_ROTATE_R, ACTION_ROTATE_R])
-                    elif dr == 3: best_moves.append(ACTION_ROTATE_L)
-                    
-                    # 2. Horizontal Move
-                    dx = x - game.piece_x
-                    if dx < 0:
-                        for _ in range(abs(dx)): best_moves.append(ACTION_LEFT)
-                    elif dx > 0:
-                        for _ in range(dx): best_moves.append(ACTION_RIGHT)
-                    
-                    # 3. Hard Drop
-                    best_moves.append(ACTION_DROP)
+                # 3. Hard Drop
+                best_moves.append(ACTION_DROP)
         
         return best_moves
 
-    def _check_collision(self, grid, shape, x, y):
-        for bx, by in shape:
-            abs_x = x + bx
-            abs_y = y + by
-            
-            # Check Boundaries
-            if abs_x < 0 or abs_x >= GRID_WIDTH:
-                return True
+    def _check_collision(self, rows, p_type, rot, x, y):
+        placed = PLACED_ROWS[p_type][rot].get(x)
+        if placed is None:
+            return True # Outside the walls
+        for ly, mask in placed:
+            abs_y = y + ly
             if abs_y >= TOTAL_HEIGHT:
                 return True
-            if abs_y < 0: 
+            if abs_y < 0:
                 continue # Above grid is fine
-                
-            # Check Grid
-            if grid[abs_y][abs_x] != 0:
+            # Check Grid (bitboard row)
+            if rows[abs_y] & mask:
                 return True
         return False
 
-    def _evaluate_board(self, grid, shape, x, y):
-        # Create a temporary lightweight grid representation to place piece
-        # We only need to copy the relevant rows or use a set of filled blocks?
-        # Full copy for simplicity (20x10 is small).
-        # Optimization: Use 1D array or bitboard if slow.
-        
-        # Place the piece
-        # We need to calculate features without full copy if possible?
-        # But 'holes' calculation needs full grid structure.
-        
-        # Let's modify a copy of the grid.
-        temp_grid = [row[:] for row in grid]
-        placed_blocks = []
-        for bx, by in shape:
+    def _evaluate_board(self, game, p_type, rot, x, y):
+        # No grid copy: start from the game's incrementally maintained
+        # statistics and apply only the 4 placed cells.
+        heights = game.column_heights[:]
+        row_counts = game.row_fill_counts
+        total_cells = game.cell_count
+        placed_rows = {}
+        for bx, by in CELLS[p_type][rot]:
             abs_x = x + bx
             abs_y = y + by
             if 0 <= abs_y < TOTAL_HEIGHT and 0 <= abs_x < GRID_WIDTH:
-                temp_grid[abs_y][abs_x] = 2 # Mark as placed
-                placed_blocks.append((abs_x, abs_y))
+                placed_rows[abs_y] = placed_rows.get(abs_y, 0) + 1
+                total_cells += 1
+                if TOTAL_HEIGHT - abs_y > heights[abs_x]:
+                    heights[abs_x] = TOTAL_HEIGHT - abs_y
         
         # --- Heuristics ---
         
-        # 1. Completed Lines
+        # 1. Completed Lines (only rows we touched)
         cleared = 0
-        # Only check rows we touched
-        affected_rows = set(py for px, py in placed_blocks)
-        for r in affected_rows:
-            if all(c != 0 for c in temp_grid[r]):
+        for r, n in placed_rows.items():
+            if row_counts[r] + n == GRID_WIDTH:
                 cleared += 1
                 
         # 2. Aggregate Height & Bumpiness & Holes
-        heights = [0] * GRID_WIDTH
-        holes = 0
-        bumpiness = 0
-        
-        for c in range(GRID_WIDTH):
-            col_height = 0
-            found_top = False
-            for r in range(TOTAL_HEIGHT):
-                if temp_grid[r][c] != 0:
-                    if not found_top:
-                        col_height = TOTAL_HEIGHT - r
-                        found_top = True
-                    # If we found top, any 0 below it is a hole
-                elif found_top:
-                    holes += 1
-            heights[c] = col_height
-            
+        # (lines are not removed here; holes = cells under column tops that are empty)
         total_height = sum(heights)
         max_height = max(heights)
+        holes = total_height - total_cells
         
+        bumpiness = 0
         for c in range(GRID_WIDTH - 1):
             bumpiness += abs(heights[c] - heights[c+1])
             
-        # Weights (Tuned for standard AI)
-        w_lines = 1000
-        w_height = -5
-        w_holes = -50 # Holes are very bad
-        w_bumpiness = -5
-        w_max_height = -5 # Panic when high
-        
-        score = (cleared * w_lines) + \
-                (total_height * w_height) + \
-                (holes * w_holes) + \
-                (bumpiness * w_bumpiness) + \
-                (max_height * w_max_height)
+        score = (cleared * self.w_lines) + \
+                (total_height * self.w_height) + \
+                (holes * self.w_holes) + \
+                (bumpiness * self.w_bumpiness) + \
+                (max_height * self.w_max_height)
                 
         return score
+
+    # --- Beam Search ---
+
+    def _beam_search(self, game, depth, deadline=None, partial=False):
+        """
+        One beam search `depth` pieces deep. Returns (first moves, value, plies
+        searched), or None if `deadline` (time.monotonic()) passed first; with
+        `partial`, the best line found by then instead, if there is one.
+        """
+        queue = [game.piece_type] + game.bag[:PREVIEW_SIZE]
+        # Beam entry: (value, lines_value, rows, board_hash, hold, queue_pos, first_moves)
+        beam = [(0, 0, tuple(game.rows), game.board_hash, game.hold_piece, 0, None)]
+        found = self._run_beam(queue, beam, 0, depth, game.hold_used, deadline, partial)
+        if found is None:
+            return None
+        beam, plies = found
+        moves = list(beam[0][6]) if beam[0][6] is not None else []
+        return moves, beam[0][0], plies
+
+    def _run_beam(self, queue, beam, ply, depth, hold_used=False, deadline=None, partial=False):
+        """
+        Searches on from `beam` (entries after `ply` pieces) until `depth` pieces,
+        keeping the best beam_width entries per ply. Returns (final beam sorted
+        best first, plies searched), or None if `deadline` passed first; with
+        `partial`, the ply cut short is returned (uncounted) if it has children.
+        """
+        depth = min(depth, len(queue))
+        budget = self.node_budget
+        nodes = 0
+        plies = ply
+        for ply in range(ply, depth):
+            children = {}
+            pending = [] if self.batch_evaluator is not None else None
+            for entry in beam:
+                limit = budget - nodes if ply > 0 and budget is not None else None
+                count = self._expand_entry(queue, entry, ply, children, hold_used, deadline, limit, pending)
+                if count is None:
+                    self._add_pending(children, pending)
+                    if not (partial and children):
+                        return None
+                    return sorted(children.values(), key=lambda entry: entry[0], reverse=True)[:self.beam_width], plies
+                nodes += count
+            self._add_pending(children, pending)
+            if not children:
+                break
+            beam = sorted(children.values(), key=lambda entry: entry[0], reverse=True)[:self.beam_width]
+            plies += 1
+            if budget is not None and nodes >= budget:
+                break
+        return beam, plies
+
+    def _expand_entry(self, queue, entry, ply, children, hold_used=False, deadline=None, limit=None, pending=None):
+        """
+        Adds the children of one beam entry to `children`, keyed by (board hash,
+        hold, queue position) so a position reached twice keeps the better line.
+        With a `pending` list the children are appended there instead, unscored
+        if the transposition table misses them; _add_pending() scores and adds
+        a whole ply of them at once.
+        Evaluates at most `limit` placements. Returns the number evaluated, or
+        None if `deadline` (time.monotonic()) passed first: checked before every
+        move generation (after ply 0's first) and, once there is a child,
+        before every placement. The children added by then stay.
+        """
+        _, lines_value, rows, board_hash, hold, pos, first = entry
+        can_hold = self.use_hold and not (ply == 0 and hold_used)
+        count = 0
+        for used_hold, p_type, next_hold, next_pos in self._piece_options(queue, pos, hold, can_hold):
+            # The first piece always gets one option expanded, so there is a move to play
+            if deadline is not None and (children or pending or ply > 0) and time.monotonic() >= deadline:
+                return None
+            misses = self.movegen.misses
+            started = time.monotonic()
+            placements = self.movegen.generate(rows, p_type, board_hash=board_hash)
+            if limit is not None:
+                placements = placements[:max(0, limit - count)]
+            count += len(placements)
+            self.nodes += len(placements)
+            for placement, new_rows, new_hash, cleared, static in self._expand(rows, board_hash, placements,
+                                                                               score=pending is None):
+                if deadline is not None and (children or pending) and time.monotonic() >= deadline:
+                    return None
+                new_lines = lines_value + cleared * self.w_lines
+                if pending is not None:
+                    moves = first if first is not None else ([ACTION_HOLD] if used_hold else []) + placement.path
+                    pending.append((static, new_lines, new_rows, new_hash, next_hold, next_pos, moves))
+                    continue
+                value = new_lines + static
+                key = (new_hash, next_hold, next_pos)
+                known = children.get(key)
+                if known is not None and known[0] >= value:
+                    continue
+                if first is None:
+                    moves = ([ACTION_HOLD] if used_hold else []) + placement.path
+                else:
+                    moves = first
+                children[key] = (value, new_lines, new_rows, new_hash, next_hold, next_pos, moves)
+            if self.movegen.misses != misses:
+                self.expansion_ms += (1000 * (time.monotonic() - started) - self.expansion_ms) / 8
+        return count
+
+    def _expand(self, rows, board_hash, placements, score=True):
+        """
+        Yields (placement, rows after clear, their hash, lines cleared, static score)
+        for every placement. With score=False a board the transposition table
+        does not know yields static None (for _add_pending to score).
+        """
+        table = self.transpositions
+        for placement in placements:
+            new_rows, cleared = self._apply_placement(rows, placement)
+            new_hash = self._child_hash(rows, board_hash, placement, new_rows, cleared)
+            static = table.probe(new_hash ^ self.table_salt)
+            if static is None and score:
+                static = self._static_score(new_rows)
+                table.store(new_hash ^ self.table_salt, static)
+            yield placement, new_rows, new_hash, cleared, static
+
+    def _add_pending(self, children, pending):
+        """
+        Adds the `pending` children of _expand_entry() to `children` as it would
+        have, in the same order. The boards without a static score are scored
+        in one BatchEvaluator pass first and stored in the transposition table.
+        """
+        if not pending:
+            return
+        misses = [i for i, child in enumerate(pending) if child[0] is None]
+        if misses:
+            table = self.transpositions
+            scores = self.batch_evaluator.static_scores([pending[i][2] for i in misses]).tolist()
+            for i, static in zip(misses, scores):
+                child = pending[i]
+                table.store(child[3] ^ self.table_salt, static)
+                pending[i] = (static,) + child[1:]
+        for static, new_lines, new_rows, new_hash, next_hold, next_pos, moves in pending:
+            value = new_lines + static
+            key = (new_hash, next_hold, next_pos)
+            known = children.get(key)
+            if known is None or known[0] < value:
+                children[key] = (value, new_lines, new_rows, new_hash, next_hold, next_pos, moves)
+        pending.clear()
+
+    def _child_hash(self, rows, board_hash, placement, new_rows, cleared):
+        """Zobrist hash of `new_rows`: incremental from the parent unless lines were cleared."""
+        if cleared:
+            return hash_rows(new_rows)
+        for r, mask in placement.footprint:
+            if 0 <= r < TOTAL_HEIGHT:
+                board_hash ^= ROW_KEYS[r][rows[r]] ^ ROW_KEYS[r][rows[r] | mask]
+        return board_hash
+
+    def _piece_options(self, queue, pos, hold, can_hold):
+        """Yields (used_hold, piece, hold_after, queue_pos_after) for one ply."""
+        if pos >= len(queue):
+            return
+        yield (False, queue[pos], hold, pos + 1)
+        if not can_hold:
+            return
+        if hold is None:
+            # Holding an empty slot brings in the next piece
+            if pos + 1 < len(queue) and queue[pos + 1] != queue[pos]:
+                yield (True, queue[pos + 1], queue[pos], pos + 2)
+        elif hold != queue[pos]:
+            yield (True, hold, queue[pos], pos + 1)
+
+    def _apply_placement(self, rows, placement):
+        """Returns (rows after lock and line clear as a tuple, lines cleared)."""
+        new_rows = list(rows)
+        full = []
+        for r, mask in placement.footprint:
+            if 0 <= r < TOTAL_HEIGHT:
+                new_rows[r] |= mask
+                if new_rows[r] == FULL_ROW:
+                    full.append(r)
+        if full:
+            for r in sorted(full):
+                del new_rows[r]
+                new_rows.insert(0, 0)
+        return tuple(new_rows), len(full)
+
+    def _static_score(self, rows):
+        """Heuristic of a board after its lines are cleared (height, holes, bumpiness)."""
+        heights = [0] * GRID_WIDTH
+        seen = 0
+        cells = 0
+        for y in range(TOTAL_HEIGHT):
+            row = rows[y]
+            if not row:
+                continue
+            cells += bin(row).count('1')
+            new = row & ~seen
+            if new:
+                for x in range(GRID_WIDTH):
+                    if (new >> x) & 1:
+                        heights[x] = TOTAL_HEIGHT - y
+                seen |= new
+        total_height = sum(heights)
+        holes = total_height - cells
+        bumpiness = 0
+        for c in range(GRID_WIDTH - 1):
+            bumpiness += abs(heights[c] - heights[c+1])
+        score = (total_height * self.w_height) + \
+                (holes * self.w_holes) + \
+                (bumpiness * self.w_bumpiness) + \
+                (max(heights) * self.w_max_height)
+        return score
@@ -0,0 +1,105 @@
+# Batched Placement Evaluation (NumPy)
+# Scores every candidate placement of a piece in one vectorized pass:
+# all result boards are built as one (K, 40) bitboard array, then lines cleared,
+# aggregate height, holes, bumpiness and max height are computed for all K at once.
+import numpy as np
+
+from tetris_core import GRID_WIDTH, TOTAL_HEIGHT, FULL_ROW
+
+_COLUMN_BITS = np.arange(GRID_WIDTH, dtype=np.int32)
+_ROW_INDEX = np.arange(TOTAL_HEIGHT)
+
+# Weights (Tuned for standard AI) -- same defaults as SmartBot
+DEFAULT_WEIGHTS = {
+    'w_lines': 1000,
+    'w_height': -5,
+    'w_holes': -50,
+    'w_bumpiness': -5,
+    'w_max_height': -5,
+}
+
+class BatchEvaluator:
+    """
+    Vectorized version of SmartBot's board heuristic.
+    Candidates are footprints: sequences of (row, row_mask) pairs
+    (movegen.Placement.footprint, or PLACED_ROWS entries shifted by y).
+    """
+    def __init__(self, **weights):
+        params = dict(DEFAULT_WEIGHTS)
+        params.update(weights)
+        self.w_lines = params['w_lines']
+        self.w_height = params['w_height']
+        self.w_holes = params['w_holes']
+        self.w_bumpiness = params['w_bumpiness']
+        self.w_max_height = params['w_max_height']
+
+    def result_boards(self, rows, footprints):
+        """(K, 40) bitboards: `rows` with each footprint locked in (no line clear)."""
+        k = len(footprints)
+        boards = np.tile(np.asarray(rows, dtype=np.int32), (k, 1))
+        cand, row_idx, masks = [], [], []
+        for i, footprint in enumerate(footprints):
+            for r, mask in footprint:
+                if 0 <= r < TOTAL_HEIGHT:
+                    cand.append(i)
+                    row_idx.append(r)
+                    masks.append(mask)
+        np.bitwise_or.at(boards, (np.array(cand, dtype=np.intp), np.array(row_idx, dtype=np.intp)),
+                         np.array(masks, dtype=np.int32))
+        return boards
+
+    def clear_lines(self, boards):
+        """Removes full rows from every board. Returns (cleared boards, lines per board)."""
+        full = boards == FULL_ROW
+        lines = full.sum(axis=1)
+        if not lines.any():
+            return boards, lines
+        # Stable sort moves full rows to the top in place of the new empty rows
+        order = np.argsort(~full, axis=1, kind='stable')
+        cleared = np.take_along_axis(boards, order, axis=1)
+        cleared[_ROW_INDEX < lines[:, None]] = 0
+        return cleared, lines
+
+    def features(self, boards):
+        """Returns (aggregate height, holes, bumpiness, max height), each shape (K,)."""
+        # Rows empty on every board add nothing: skip the top of the well
+        occupied = boards.any(axis=0)
+        first = int(occupied.argmax()) if occupied.any() else TOTAL_HEIGHT - 1
+        boards = boards[:, first:]
+        cells = (boards[:, :, None] >> _COLUMN_BITS) & 1 # (K, rows, 10)
+        filled = cells.any(axis=1)
+        top = cells.argmax(axis=1) # First filled row per column
+        heights = np.where(filled, boards.shape[1] - top, 0)
+        total_height = heights.sum(axis=1)
+        holes = total_height - cells.sum(axis=(1, 2))
+        bumpiness = np.abs(np.diff(heights, axis=1)).sum(axis=1)
+        return total_height, holes, bumpiness, heights.max(axis=1)
+
+    def static_scores(self, boards):
+        """Heuristic without the lines term of already-cleared boards (sequences of 40 row masks)."""
+        total_height, holes, bumpiness, max_height = self.features(np.array(boards, dtype=np.int32))
+        return (total_height * self.w_height) + \
+               (holes * self.w_holes) + \
+               (bumpiness * self.w_bumpiness) + \
+               (max_height * self.w_max_height)
+
+    def score(self, rows, footprints, clear=False):
+        """
+        Scores all footprints on board `rows`.
+        clear=False: SmartBot._evaluate_board semantics (full lines are counted
+                     but stay on the board for the height/hole features).
+        clear=True:  lines are removed before the board features are taken.
+        Returns (scores, boards, lines): boards are the (cleared if clear=True) result boards.
+        """
+        boards = self.result_boards(rows, footprints)
+        if clear:
+            boards, lines = self.clear_lines(boards)
+        else:
+            lines = (boards == FULL_ROW).sum(axis=1)
+        total_height, holes, bumpiness, max_height = self.features(boards)
+        scores = (lines * self.w_lines) + \
+                 (total_height * self.w_height) + \
+                 (holes * self.w_holes) + \
+                 (bumpiness * self.w_bumpiness) + \
+                 (max_height * self.w_max_height)
+        return scores, boards, lines
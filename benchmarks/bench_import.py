@@ -0,0 +1,63 @@
+# Import-time benchmark (worker cold start)
+# Every measurement runs in a fresh interpreter so nothing is cached in sys.modules.
+#
+# Usage:
+#   python benchmarks/bench_import.py                 # report
+#   python benchmarks/bench_import.py --max-ms 150    # fail (exit 1) on regression
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a headless worker may import. None of them may pull in pygame.
+HEADLESS_MODULES = ['tetris_core', 'tetris', 'tetris_controller', 'ai_logic']
+
+PROBE = (
+    "import sys, time\n"
+    "t = time.perf_counter()\n"
+    "import {module}\n"
+    "dt = (time.perf_counter() - t) * 1000\n"
+    "print(dt, 'pygame' in sys.modules)\n"
+)
+
+def measure(module, repeat):
+    """Returns (best import ms, best process ms, pygame_loaded) over `repeat` fresh interpreters."""
+    best_import = float('inf')
+    best_process = float('inf')
+    pygame_loaded = False
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = subprocess.run(
+            [sys.executable, '-c', PROBE.format(module=module)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        process_ms = (time.perf_counter() - start) * 1000
+        best_import = min(best_import, float(out[0]))
+        best_process = min(best_process, process_ms)
+        pygame_loaded = pygame_loaded or out[1] == 'True'
+    return best_import, best_process, pygame_loaded
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of the headless modules.")
+    parser.add_argument('--repeat', type=int, default=5, help="fresh interpreters per module (best is reported)")
+    parser.add_argument('--max-ms', type=float, default=None, help="fail if any module import takes longer than this")
+    args = parser.parse_args(argv)
+
+    failed = False
+    print(f"{'module':<20}{'import ms':>12}{'process ms':>12}  pygame")
+    for module in HEADLESS_MODULES:
+        import_ms, process_ms, pygame_loaded = measure(module, args.repeat)
+        print(f"{module:<20}{import_ms:>12.2f}{process_ms:>12.2f}  {'LOADED' if pygame_loaded else 'no'}")
+        if pygame_loaded:
+            print(f"  REGRESSION: importing {module} loads pygame")
+            failed = True
+        if args.max_ms is not None and import_ms > args.max_ms:
+            print(f"  REGRESSION: {module} import took {import_ms:.2f} ms (limit {args.max_ms} ms)")
+            failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# Game server benchmark client
+# Starts game_server.py in a subprocess on a temporary Unix socket, creates
+# many sessions over one connection and drives them with batched random placements.
+#
+# Usage:
+#   python benchmarks/bench_server.py                        # 1000 sessions, 20 rounds
+#   python benchmarks/bench_server.py --sessions 5000 --rounds 50
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from game_server import GameClient, OP_PLACE, FLAG_GAME_OVER
+
+async def run(path, sessions, rounds, seed):
+    for _ in range(100): # Wait for the server to listen
+        if os.path.exists(path):
+            break
+        await asyncio.sleep(0.05)
+    client = await GameClient.connect_unix(path)
+    ids = await client.create(sessions, seed=seed)
+    updated = set()
+    while len(updated) < sessions:
+        updated.update(await client.recv_deltas())
+
+    rng = random.Random(seed)
+    actions = 0
+    start_bytes = client.bytes_received
+    start = time.perf_counter()
+    for _ in range(rounds):
+        live = [s for s in ids if not client.state[s][0] & FLAG_GAME_OVER]
+        if not live:
+            break
+        await client.send_actions((s, OP_PLACE, rng.randint(-1, 8), rng.randint(0, 3)) for s in live)
+        actions += len(live)
+        updated = set()
+        while len(updated) < len(live):
+            updated.update(await client.recv_deltas())
+    elapsed = time.perf_counter() - start
+    received = client.bytes_received - start_bytes
+    await client.close()
+    return actions, elapsed, received
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure game server throughput with batched placements.")
+    parser.add_argument('--sessions', type=int, default=1000, help="games driven over one connection")
+    parser.add_argument('--rounds', type=int, default=20, help="placements sent to every live session")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tetris.sock')
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'game_server.py'), '--unix', path],
+                                  cwd=ROOT, stdout=subprocess.DEVNULL)
+        try:
+            actions, elapsed, received = asyncio.run(run(path, args.sessions, args.rounds, args.seed))
+        finally:
+            server.terminate()
+            server.wait()
+    print(f"{actions} placements in {elapsed:.2f} s: {actions / elapsed:,.0f} placements/s, "
+          f"{received / max(actions, 1):.1f} bytes of delta per placement")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
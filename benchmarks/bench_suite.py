@@ -0,0 +1,283 @@
+# Engine, bot and renderer benchmark suite
+# Micro benchmarks of the TetrisGame hot paths, SmartBot decisions, whole
+# headless games and draw_grid (SDL dummy video driver), all on a fixed corpus
+# of positions recorded from seeded games, so two runs measure the same work.
+# Every benchmark reports the best of `--repeat` runs with the GC disabled.
+# State-changing methods are timed as (reset + call) minus (reset alone).
+#
+# Usage:
+#   python benchmarks/bench_suite.py --out results.json                 # run, save JSON
+#   python benchmarks/bench_suite.py --out base.json && <change things>
+#   python benchmarks/bench_suite.py --compare base.json --threshold 0.1   # exit 1 on regression
+#   python benchmarks/bench_suite.py --only engine.                     # a subset by name prefix
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from tetris_core import TetrisGame, TOTAL_HEIGHT
+from piece_tables import MIN_X, MAX_X
+from ai_logic import SmartBot
+
+VERSION = 1
+CORPUS_SEEDS = range(4)
+CORPUS_PIECES = 60      # Placements recorded per corpus game
+GARBAGE_EVERY = 7       # A garbage line is queued every this many placements
+GAME_PIECES = 200       # Placements per game of the headless-games benchmark
+CAPTURED = ('_rotate', '_hard_drop', '_check_and_start_clear', '_process_garbage')
+
+# --- Corpus ---
+
+def build_corpus():
+    """
+    Plays the corpus games with the greedy SmartBot and records, for every piece,
+    its snapshot before it moves, and for every call of a CAPTURED method the
+    snapshot right before the call with its arguments.
+    """
+    positions = []
+    calls = {name: [] for name in CAPTURED}
+    bot = SmartBot()
+    for seed in CORPUS_SEEDS:
+        game = TetrisGame(seed=seed)
+        for name in CAPTURED:
+            method = getattr(game, name)
+            def spy(*args, _name=name, _method=method):
+                calls[_name].append((game.snapshot(), args))
+                return _method(*args)
+            setattr(game, name, spy)
+        for piece in range(CORPUS_PIECES):
+            if game.game_over:
+                break
+            positions.append(game.snapshot())
+            if piece % GARBAGE_EVERY == GARBAGE_EVERY - 1:
+                game.garbage_queue += 1
+            for action in bot.get_moves(game):
+                game.step(action)
+            while game.in_clear_anim:
+                game.update(game.clear_anim_duration)
+    return positions, calls
+
+# --- Timing ---
+
+def best_of(run, repeat):
+    """Best wall time (s) of `repeat` calls of run(), GC disabled."""
+    best = float('inf')
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if enabled:
+            gc.enable()
+    return best
+
+def bench_collision(positions, repeat):
+    """_check_collision over every (x, y, rot) of the current piece on each corpus board."""
+    cases = []
+    for snap in positions:
+        game = TetrisGame.from_snapshot(snap)
+        p = game.piece_type
+        args = [(x, y, rot, p) for rot in range(4) for x in range(MIN_X[p][rot] - 1, MAX_X[p][rot] + 2)
+                for y in range(0, TOTAL_HEIGHT, 2)]
+        cases.append((game._check_collision, args))
+    count = sum(len(args) for _, args in cases)
+    def run():
+        for check, args in cases:
+            for a in args:
+                check(*a)
+    return best_of(run, repeat) / count * 1e9
+
+# How to put a game back before the next call of a CAPTURED method, as
+# (save, reset): only the state the method changes is reset, so the reset
+# costs far less than the call (except for _hard_drop, which changes everything).
+def _save_garbage(game):
+    return game.rows[:], game.colors[:], game.garbage_queue, game.garbage_dealt
+
+def _reset_garbage(game, saved):
+    rows, colors, game.garbage_queue, game.garbage_dealt = saved
+    game.rows, game.colors = rows[:], colors[:] # It replaces rows wholesale
+    game.game_over = False
+
+def _reset_piece(game, saved):
+    game.piece_x, game.piece_y, game.piece_rot = saved
+
+# Everything _check_and_start_clear writes (it reads the board, never changes it)
+_CLEAR_FIELDS = ('score', 'combo', 'back_to_back', 'show_b2b', 'last_attack', 'last_clear_y', 'is_perfect_clear',
+                 'in_clear_anim', 'clear_timer', 'clearing_lines')
+
+def _save_clear(game):
+    return tuple(getattr(game, name) for name in _CLEAR_FIELDS)
+
+def _reset_clear(game, saved):
+    for name, value in zip(_CLEAR_FIELDS, saved):
+        setattr(game, name, value)
+
+RESETS = {
+    '_rotate': (lambda game: (game.piece_x, game.piece_y, game.piece_rot), _reset_piece),
+    '_hard_drop': (TetrisGame.snapshot, TetrisGame.restore),       # Locks, clears and spawns
+    '_check_and_start_clear': (_save_clear, _reset_clear),
+    '_process_garbage': (_save_garbage, _reset_garbage),
+}
+
+def bench_captured(name, samples, repeat, passes=4):
+    """One CAPTURED method on its recorded inputs: (reset + call) - reset, per call."""
+    save, reset = RESETS[name]
+    cases = []
+    for snap, args in samples:
+        game = TetrisGame.from_snapshot(snap)
+        cases.append((game, save(game), getattr(game, name), args))
+    def run_call():
+        for _ in range(passes):
+            for game, saved, method, args in cases:
+                reset(game, saved)
+                method(*args)
+    def run_reset():
+        for _ in range(passes):
+            for game, saved, _, _ in cases:
+                reset(game, saved)
+    total = best_of(run_call, repeat)
+    base = best_of(run_reset, repeat)
+    return max(0.0, total - base) / (passes * len(cases)) * 1e9
+
+def bench_bot(positions, repeat, **options):
+    """SmartBot.get_moves on every corpus position (fresh bot per run, so caches start cold)."""
+    games = [TetrisGame.from_snapshot(snap) for snap in positions]
+    def run():
+        bot = SmartBot(**options)
+        for game in games:
+            bot.get_moves(game)
+    return best_of(run, repeat) / len(games) * 1e3
+
+def bench_games(repeat):
+    """Whole headless games with the greedy SmartBot (keypresses, clears resolved at once)."""
+    placed = [0]
+    def run():
+        placed[0] = 0
+        bot = SmartBot()
+        for seed in CORPUS_SEEDS:
+            game = TetrisGame(seed=seed)
+            for _ in range(GAME_PIECES):
+                if game.game_over:
+                    break
+                for action in bot.get_moves(game):
+                    game.step(action)
+                while game.in_clear_anim:
+                    game.update(game.clear_anim_duration)
+                placed[0] += 1
+    seconds = best_of(run, repeat)
+    return placed[0] / seconds
+
+def bench_draw_grid(positions, repeat):
+    """draw_grid of one player's board per frame, on a surface of the window's size."""
+    try:
+        import pygame
+        import tetris_render
+    except ImportError:
+        return None
+    pygame.init()
+    screen = pygame.Surface((tetris_render.SCREEN_WIDTH, tetris_render.SCREEN_HEIGHT))
+    games = [TetrisGame.from_snapshot(snap) for snap in positions]
+    tetris_render.draw_grid(screen, games[0], 100, 60) # Font and cache setup
+    def run():
+        for game in games:
+            tetris_render.draw_grid(screen, game, 100, 60)
+    return len(games) / best_of(run, repeat)
+
+# name -> (unit, higher_is_better)
+UNITS = {'ns/call': False, 'ms/move': False, 'pieces/s': True, 'frames/s': True}
+
+def run_suite(repeat, only=None):
+    positions, calls = build_corpus()
+    benches = [('engine._check_collision', 'ns/call', lambda: bench_collision(positions, repeat))]
+    for name in CAPTURED:
+        benches.append((f'engine.{name}', 'ns/call', lambda name=name: bench_captured(name, calls[name], repeat)))
+    benches += [
+        ('bot.greedy', 'ms/move', lambda: bench_bot(positions, repeat)),
+        ('bot.beam', 'ms/move', lambda: bench_bot(positions, max(1, repeat // 2),
+                                                  beam_width=6, depth=3, use_hold=True)),
+        ('games.greedy', 'pieces/s', lambda: bench_games(max(1, repeat // 2))),
+        ('render.draw_grid', 'frames/s', lambda: bench_draw_grid(positions, repeat)),
+    ]
+    results = {}
+    for name, unit, bench in benches:
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        value = bench()
+        if value is None:
+            print(f"{name:<34}{'skipped (pygame not installed)':>24}")
+            continue
+        results[name] = {'value': value, 'unit': unit, 'higher_is_better': UNITS[unit]}
+        print(f"{name:<34}{value:>14.2f} {unit}")
+    return results, {'positions': len(positions), **{name: len(samples) for name, samples in calls.items()}}
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, threshold):
+    """Prints the change of every benchmark against `baseline`; returns the names that regressed."""
+    regressed = []
+    print(f"\n{'benchmark':<34}{'baseline':>14}{'current':>14}{'change':>10}")
+    for name, current in results.items():
+        base = baseline['results'].get(name)
+        if base is None or base['unit'] != current['unit'] or not base['value']:
+            print(f"{name:<34}{'-':>14}{current['value']:>14.2f}{'new':>10}")
+            continue
+        change = current['value'] / base['value'] - 1
+        worse = -change if current['higher_is_better'] else change
+        flag = ''
+        if worse > threshold:
+            regressed.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<34}{base['value']:>14.2f}{current['value']:>14.2f}{change:>+10.1%}{flag}")
+    return regressed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the engine, bot and renderer hot paths.")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per benchmark (best is reported)")
+    parser.add_argument('--only', action='append', metavar='PREFIX',
+                        help="only benchmarks whose name starts with PREFIX (engine., bot., games., render.)")
+    parser.add_argument('--out', help="write the results to this JSON file (e.g. to use as a baseline)")
+    parser.add_argument('--compare', metavar='BASELINE', help="compare with a JSON file written by --out")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="relative slowdown flagged as a regression (default 0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    results, corpus = run_suite(args.repeat, args.only)
+    report = {
+        'version': VERSION,
+        'meta': {'commit': _git_commit(), 'python': platform.python_version(),
+                 'implementation': platform.python_implementation(), 'machine': platform.machine(),
+                 'platform': platform.platform(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                 'repeat': args.repeat, 'corpus': corpus},
+        'results': results,
+    }
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressed = compare(results, baseline, args.threshold)
+        if regressed:
+            print(f"\n{len(regressed)} regression(s) over {args.threshold:.0%}: {', '.join(regressed)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+# Self-Play Datasets (NumPy)
+# Runs a bot headless and streams one fixed-width record per placement into
+# raw, append-only shard files. Readers memory-map the shards, so slicing a
+# dataset of tens of millions of placements never loads it into RAM.
+#
+# Layout of a dataset directory:
+#   shard_00000.bin, shard_00001.bin, ...  -- RECORD_DTYPE records back to back
+#   index.json  -- dtype, shard file names and record counts (rewritten on every flush)
+import json
+import os
+
+import numpy as np
+
+from tetris_core import TetrisGame, TOTAL_HEIGHT, ACTION_DROP, ACTION_HOLD
+from ai_logic import PREVIEW_SIZE
+
+INDEX_FILE = 'index.json'
+VERSION = 1
+
+RECORD_DTYPE = np.dtype([
+    ('board', '<u2', (TOTAL_HEIGHT,)),  # Bitboard before the placement (TetrisGame.rows)
+    ('piece', 'u1'),                    # Current piece (1-7)
+    ('queue', 'u1', (PREVIEW_SIZE,)),   # NEXT queue
+    ('hold', 'u1'),                     # Held piece (0 = empty)
+    ('x', 'i1'),                        # Chosen placement: piece state at lock
+    ('y', 'i1'),
+    ('rot', 'u1'),
+    ('use_hold', '?'),                  # The bot swapped with hold first
+    ('reward', '<f4'),                  # Score gained by the placement
+    ('game', '<u8'),                    # Seed of the game and placement number within it
+    ('move', '<u4'),
+])
+
+
+class DatasetWriter:
+    """
+    Buffered, append-only writer of RECORD_DTYPE records.
+    Records are buffered `buffer_size` at a time, then appended to the current
+    shard; a new shard starts every `shard_size` records. Use as a context
+    manager (or call close()) so the last buffer is flushed.
+    """
+    def __init__(self, directory, shard_size=1 << 20, buffer_size=1 << 14):
+        self.directory = directory
+        self.shard_size = shard_size
+        self.buffer = np.zeros(buffer_size, dtype=RECORD_DTYPE)
+        self.buffered = 0
+        os.makedirs(directory, exist_ok=True)
+        self.shards = self._read_index()['shards'] # [{'file', 'records'}], appended to
+
+    def _read_index(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(path):
+            return {'shards': []}
+        with open(path) as f:
+            index = json.load(f)
+        if np.dtype([tuple(field) for field in index['dtype']]) != RECORD_DTYPE:
+            raise ValueError(f"{self.directory} holds records of a different layout")
+        return index
+
+    def _write_index(self):
+        index = {'version': VERSION, 'dtype': RECORD_DTYPE.descr, 'shards': self.shards}
+        path = os.path.join(self.directory, INDEX_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(index, f)
+        os.replace(path + '.tmp', path) # Readers never see a half-written index
+
+    def next_record(self):
+        """Returns the next free record of the buffer to fill in (flushes a full buffer first)."""
+        if self.buffered == len(self.buffer):
+            self.flush()
+        record = self.buffer[self.buffered]
+        self.buffered += 1
+        return record
+
+    def discard_last(self):
+        """Drops the record last returned by next_record() (e.g. a placement that did not happen)."""
+        if not self.buffered:
+            raise ValueError("no buffered record to discard")
+        self.buffered -= 1
+
+    def flush(self):
+        """Appends the buffered records to the shards and updates the index."""
+        start = 0
+        while start < self.buffered:
+            if not self.shards or self.shards[-1]['records'] >= self.shard_size:
+                self.shards.append({'file': f'shard_{len(self.shards):05d}.bin', 'records': 0})
+            shard = self.shards[-1]
+            count = min(self.buffered - start, self.shard_size - shard['records'])
+            with open(os.path.join(self.directory, shard['file']), 'ab') as f:
+                f.write(self.buffer[start:start + count].tobytes())
+            shard['records'] += count
+            start += count
+        self.buffered = 0
+        self._write_index()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DatasetReader:
+    """Memory-mapped view of a dataset directory: len(), integer indexing and slicing across shards."""
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE)) as f:
+            index = json.load(f)
+        self.shards = [np.memmap(os.path.join(directory, shard['file']), dtype=RECORD_DTYPE,
+                                 mode='r', shape=(shard['records'],))
+                       for shard in index['shards'] if shard['records']]
+        self.offsets = np.cumsum([0] + [len(shard) for shard in self.shards])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                return self[start:stop][::step]
+            parts = []
+            for i, shard in enumerate(self.shards):
+                lo, hi = self.offsets[i], self.offsets[i + 1]
+                if hi > start and lo < stop:
+                    parts.append(shard[max(start, lo) - lo:min(stop, hi) - lo])
+            if len(parts) == 1:
+                return parts[0] # Still a view into the memory map
+            return np.concatenate(parts) if parts else np.zeros(0, dtype=RECORD_DTYPE)
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("record index out of range")
+        i = int(np.searchsorted(self.offsets, key, side='right')) - 1
+        return self.shards[i][key - self.offsets[i]]
+
+
+def play_placement(game, bot, record):
+    """
+    Lets `bot` place the game's current piece and fills `record` with the
+    position before it, the placement it chose and the score it gained.
+    Line clears are resolved at once. Returns False if the bot did not lock a piece.
+    """
+    record['board'] = game.rows
+    record['piece'] = game.piece_type
+    queue = game.bag[:PREVIEW_SIZE]
+    record['queue'] = queue + [0] * (PREVIEW_SIZE - len(queue))
+    record['hold'] = game.hold_piece or 0
+    score = game.score
+    use_hold = False
+
+    # Everything up to the drop moves the piece; the drop locks it
+    for action in bot.get_moves(game):
+        if action == ACTION_DROP:
+            break
+        use_hold |= action == ACTION_HOLD and not game.hold_used
+        game.step(action)
+    if game.game_over:
+        return False
+    record['x'] = game.piece_x
+    record['y'] = game.get_ghost_y()
+    record['rot'] = game.piece_rot
+    record['use_hold'] = use_hold
+    game.step(ACTION_DROP)
+    while game.in_clear_anim:
+        game.update(game.clear_anim_duration)
+    record['reward'] = game.score - score
+    return True
+
+
+def generate(bot, directory, games, max_pieces=1000, seed=0, **writer_options):
+    """
+    Self-play: runs `games` headless games (seeds seed, seed + 1, ...) of at most
+    `max_pieces` placements with `bot` and appends one record per placement to `directory`.
+    Returns the number of records written.
+    """
+    written = 0
+    with DatasetWriter(directory, **writer_options) as writer:
+        for g in range(games):
+            game = TetrisGame(seed=seed + g)
+            for move in range(max_pieces):
+                if game.game_over:
+                    break
+                record = writer.next_record()
+                record['game'] = seed + g
+                record['move'] = move
+                if not play_placement(game, bot, record):
+                    writer.discard_last() # Drop the unfinished record
+                    break
+                written += 1
+    return written
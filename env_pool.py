@@ -0,0 +1,241 @@
+# Multiprocess Environment Pool
+# Shards num_envs TetrisEnvs across worker processes. Actions, observations,
+# rewards and done flags live in multiprocessing.shared_memory arrays: each
+# env writes its observation straight into its row of the shared buffer, and
+# the pipes to the workers only carry one-word commands and acknowledgements.
+# An exception in a worker is sent back in place of the acknowledgement and
+# re-raised in the parent; the worker keeps serving commands.
+import multiprocessing as mp
+import pickle
+import traceback
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+
+import numpy as np
+
+from tetris_env import TetrisEnv, OBSERVATIONS, observation_size
+from ai_logic import PREVIEW_SIZE
+
+# Per-env shared arrays (plus 'obs', num_envs x obs_size uint8)
+_FIELDS = {
+    'actions': np.int64,
+    'rewards': np.float32,
+    'terminated': np.bool_,
+    'truncated': np.bool_,
+}
+
+def _views(blocks, num_envs, obs_size):
+    """NumPy arrays over the shared memory blocks."""
+    arrays = {key: np.ndarray((num_envs,), dtype=dtype, buffer=blocks[key].buf) for key, dtype in _FIELDS.items()}
+    arrays['obs'] = np.ndarray((num_envs, obs_size), dtype=np.uint8, buffer=blocks['obs'].buf)
+    return arrays
+
+class _RemoteTraceback(Exception):
+    """Cause attached to an exception re-raised from a worker: the worker's traceback."""
+    def __init__(self, tb):
+        self.tb = tb
+
+    def __str__(self):
+        return self.tb
+
+def _error_reply(exc):
+    """What a worker sends back when a command raised: (exception, traceback text)."""
+    tb = ''.join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+    try:
+        data = pickle.dumps(exc)
+        pickle.loads(data) # Some exception types do not survive the trip
+        return data, tb
+    except Exception:
+        return pickle.dumps(RuntimeError(repr(exc))), tb
+
+def _worker(conn, names, num_envs, obs_size, lo, hi, seed, auto_reset, env_kwargs):
+    blocks = {key: shared_memory.SharedMemory(name=name) for key, name in names.items()}
+    arrays = _views(blocks, num_envs, obs_size)
+    obs, actions = arrays['obs'], arrays['actions']
+    rewards, terminated, truncated = arrays['rewards'], arrays['terminated'], arrays['truncated']
+    envs = [TetrisEnv(flatten=True, buffer=obs[i], **env_kwargs) for i in range(lo, hi)]
+    try:
+        while True:
+            cmd = conn.recv()
+            if cmd == 'close':
+                break
+            try:
+                if cmd == 'step':
+                    for i, env in enumerate(envs, lo):
+                        _, rewards[i], terminated[i], truncated[i], _ = env.step(actions[i])
+                        if auto_reset and (terminated[i] or truncated[i]):
+                            env.reset()
+                elif cmd == 'reset':
+                    for i, env in enumerate(envs, lo):
+                        env.reset(seed=None if seed is None else seed + i)
+                    rewards[lo:hi] = 0
+                    terminated[lo:hi] = False
+                    truncated[lo:hi] = False
+            except Exception as exc:
+                conn.send(_error_reply(exc))
+                continue
+            conn.send(cmd)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        del obs, actions, rewards, terminated, truncated, arrays
+        for block in blocks.values():
+            block.close()
+
+
+class TetrisEnvPool:
+    """
+    num_envs TetrisEnvs (flattened observations) split evenly over num_workers processes.
+      auto_reset -- reset an env in the same step it terminates or truncates; the
+                    returned observation is then the first one of the new episode.
+      seed       -- env i is reset with seed + i by reset() (None = unseeded).
+      env_kwargs -- passed to TetrisEnv (action_mode, observations, max_steps, ...).
+    Synchronous: reset(), step(actions). Asynchronous: send(actions, worker_ids)
+    starts the given workers, recv() returns the results of whichever are done.
+    An exception raised by an env in a worker (e.g. step() before reset()) is
+    re-raised by the call that collects that worker's results, once every
+    other worker of the call has answered; the pool stays usable.
+    reset() and step() return views of the shared memory, overwritten by the
+    next step; recv() returns copies (the ready envs are gathered by index).
+    """
+    def __init__(self, num_envs, num_workers=None, seed=0, auto_reset=True, start_method=None, **env_kwargs):
+        self.num_envs = num_envs
+        self.num_workers = min(num_workers or mp.cpu_count(), num_envs)
+        self.obs_size = observation_size(env_kwargs.get('observations', OBSERVATIONS),
+                                         env_kwargs.get('preview', PREVIEW_SIZE))
+        ctx = mp.get_context(start_method)
+
+        sizes = {key: num_envs * np.dtype(dtype).itemsize for key, dtype in _FIELDS.items()}
+        sizes['obs'] = num_envs * self.obs_size
+        self._blocks = {key: shared_memory.SharedMemory(create=True, size=size) for key, size in sizes.items()}
+        names = {key: block.name for key, block in self._blocks.items()}
+        arrays = _views(self._blocks, num_envs, self.obs_size)
+        self.obs = arrays['obs']
+        self.actions = arrays['actions']
+        self.rewards = arrays['rewards']
+        self.terminated = arrays['terminated']
+        self.truncated = arrays['truncated']
+
+        # Worker w owns envs [bounds[w], bounds[w + 1])
+        self.bounds = [num_envs * w // self.num_workers for w in range(self.num_workers + 1)]
+        self._conns = []
+        self._procs = []
+        for w in range(self.num_workers):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker, daemon=True,
+                               args=(child, names, num_envs, self.obs_size, self.bounds[w], self.bounds[w + 1],
+                                     seed, auto_reset, env_kwargs))
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+        self._busy = set() # Workers stepping asynchronously
+        self.closed = False
+
+    def env_ids(self, worker):
+        """Range of the envs hosted by `worker`."""
+        return range(self.bounds[worker], self.bounds[worker + 1])
+
+    def _command(self, cmd, workers):
+        for w in workers:
+            self._conns[w].send(cmd)
+        self._collect(workers)
+
+    def _collect(self, workers):
+        """Receives the acknowledgements of `workers`; then re-raises the first worker exception among them."""
+        error = None
+        for w in workers:
+            reply = self._conns[w].recv()
+            if isinstance(reply, tuple) and error is None:
+                error = reply
+        if error is not None:
+            data, tb = error
+            exc = pickle.loads(data)
+            exc.__cause__ = _RemoteTraceback(tb)
+            raise exc
+
+    def reset(self):
+        """Resets every env; returns the (num_envs, obs_size) observations."""
+        self._drain()
+        self._command('reset', range(self.num_workers))
+        return self.obs
+
+    def step(self, actions):
+        """Steps every env with actions[i]; returns (obs, rewards, terminated, truncated)."""
+        self._drain()
+        self.actions[:] = actions
+        self._command('step', range(self.num_workers))
+        return self.obs, self.rewards, self.terminated, self.truncated
+
+    def send(self, actions, workers=None):
+        """Starts stepping `workers` (default: every idle one) with their slices of `actions` (length num_envs)."""
+        if workers is None:
+            workers = [w for w in range(self.num_workers) if w not in self._busy]
+        for w in workers:
+            if w in self._busy:
+                raise RuntimeError(f"worker {w} is still stepping")
+            lo, hi = self.bounds[w], self.bounds[w + 1]
+            self.actions[lo:hi] = actions[lo:hi]
+            self._conns[w].send('step')
+            self._busy.add(w)
+
+    def recv(self, timeout=None):
+        """
+        Waits for at least one stepping worker and returns (workers, env_ids, obs,
+        rewards, terminated, truncated) for the envs of every worker that is done.
+        The arrays are copies, so they stay valid while those workers step again.
+        Raises RuntimeError if no worker is stepping (nothing to wait for).
+        """
+        if not self._busy:
+            raise RuntimeError("no worker is stepping; call send() first")
+        ready = wait([self._conns[w] for w in self._busy], timeout)
+        workers = sorted(self._conns.index(conn) for conn in ready)
+        self._busy.difference_update(workers)
+        self._collect(workers)
+        ids = np.concatenate([np.arange(self.bounds[w], self.bounds[w + 1]) for w in workers]) \
+            if workers else np.zeros(0, dtype=np.int64)
+        return workers, ids, self.obs[ids], self.rewards[ids], self.terminated[ids], self.truncated[ids]
+
+    def _drain(self):
+        """Waits for asynchronous steps still running (then re-raises the first worker exception among them)."""
+        error = None
+        while self._busy:
+            try:
+                self.recv()
+            except Exception as exc:
+                error = error or exc
+        if error is not None:
+            raise error
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._drain()
+        except Exception:
+            pass # Results nobody will read, or the error of a worker shut down anyway
+        try:
+            for conn in self._conns:
+                conn.send('close')
+        except (BrokenPipeError, EOFError):
+            pass
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        self.obs = self.actions = self.rewards = self.terminated = self.truncated = None
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        if not getattr(self, 'closed', True):
+            self.close()
+
@@ -0,0 +1,368 @@
+# Headless Game Server (asyncio)
+# Hosts many TetrisGame sessions for agents in other processes or languages.
+# Agents connect over a Unix socket or localhost TCP, send batched actions and
+# receive batched state deltas: only the board rows that changed since the last
+# message for a session are sent, as (row, mask) pairs of the bitboard.
+#
+# Wire format: every message is struct HEADER (payload length, type) + payload,
+# all integers little-endian.
+#   client -> server
+#     CREATE   count:u16 seed:u64          -> CREATED first_id:u32 count:u16, then a DELTAS with the new sessions
+#     ACTIONS  n:u16, n x ACTION           -> DELTAS for the sessions that changed
+#              ACTION = session:u32 op:u8 x:i8 rot:u8; op 0-7: TetrisGame.step(op),
+#              OP_PLACE: place(x, rot), OP_PLACE_HOLD: place(x, rot, use_hold=True)
+#     RESET    n:u16, n x (session:u32 seed:u64)
+#     CLOSE    n:u16, n x session:u32
+#   server -> client
+#     DELTAS   n:u16, n x (DELTA_HEAD, queue:u8[PREVIEW_SIZE], rows:u8, rows x (index:u8 mask:u16))
+#              (a round with more than MAX_COUNT sessions is split over several messages,
+#              as GameClient splits larger CREATE, ACTIONS and RESET requests)
+#     ERROR    utf-8 message (a bad request, or a session that failed while applying actions)
+# Backpressure: each session queues at most `max_pending` actions. When a session
+# is full the connection stops reading until its queue drains, and the queue only
+# drains as fast as the client reads its deltas, so a slow agent throttles itself
+# through the socket without growing server memory.
+import asyncio
+import struct
+from collections import deque
+
+from tetris_core import TetrisGame, TOTAL_HEIGHT
+from ai_logic import PREVIEW_SIZE
+
+HEADER = struct.Struct('<IB')
+CREATE, ACTIONS, RESET, CLOSE = 1, 2, 3, 4
+CREATED, DELTAS, ERROR = 0x81, 0x82, 0xFF
+
+OP_PLACE = 8
+OP_PLACE_HOLD = 9
+
+COUNT = struct.Struct('<H')
+MAX_COUNT = 0xFFFF # Entries per counted message (u16 count); longer batches are split
+CREATE_BODY = struct.Struct('<HQ')
+CREATED_BODY = struct.Struct('<IH')
+ACTION = struct.Struct('<IBbB')
+RESET_ENTRY = struct.Struct('<IQ')
+SESSION = struct.Struct('<I')
+DELTA_HEAD = struct.Struct('<IBBbbBBI') # session, flags, piece, x, y, rot, hold, score
+ROW = struct.Struct('<BH')
+
+# DELTA flags
+FLAG_GAME_OVER = 1
+FLAG_INVALID = 2 # A placement of the batch was unreachable (no-op)
+FLAG_RESET = 4   # The session was reset since its last delta
+
+_EMPTY_ROWS = (0,) * TOTAL_HEIGHT
+
+
+class Session:
+    __slots__ = ('id', 'game', 'pending', 'sent_rows', 'flags')
+
+    def __init__(self, session_id, seed):
+        self.id = session_id
+        self.game = TetrisGame(seed=seed)
+        self.pending = deque()        # (op, x, rot) not applied yet
+        self.sent_rows = _EMPTY_ROWS  # Board the client has
+        self.flags = FLAG_RESET
+
+    def apply(self, op, x, rot):
+        game = self.game
+        if op == OP_PLACE or op == OP_PLACE_HOLD:
+            if not game.place(x, rot, op == OP_PLACE_HOLD):
+                self.flags |= FLAG_INVALID
+        else:
+            game.step(op)
+        while game.in_clear_anim:
+            game.update(game.clear_anim_duration) # Headless: clears resolve at once
+
+    def delta(self, out):
+        """Appends this session's DELTAS entry to bytearray `out`."""
+        game = self.game
+        rows = game.rows
+        sent = self.sent_rows
+        changed = [(y, rows[y]) for y in range(TOTAL_HEIGHT) if rows[y] != sent[y]]
+        flags = self.flags | (FLAG_GAME_OVER if game.game_over else 0)
+        out += DELTA_HEAD.pack(self.id, flags, game.piece_type, game.piece_x, game.piece_y, game.piece_rot,
+                               game.hold_piece or 0, game.score & 0xFFFFFFFF)
+        queue = game.bag[:PREVIEW_SIZE]
+        out += bytes(queue) + bytes(PREVIEW_SIZE - len(queue))
+        out.append(len(changed))
+        for y, mask in changed:
+            out += ROW.pack(y, mask)
+        self.sent_rows = tuple(rows)
+        self.flags = 0
+
+
+def _message(kind, payload):
+    return HEADER.pack(len(payload), kind) + payload
+
+
+class GameServer:
+    """
+    Serves TetrisGame sessions; every connection owns the sessions it creates.
+      max_pending -- actions a session may queue before the connection stops reading
+      batch       -- actions applied per session before deltas are sent
+    """
+    def __init__(self, max_pending=256, batch=64):
+        self.max_pending = max_pending
+        self.batch = batch
+        self.next_id = 1
+        self.sessions = {}
+        self.server = None
+
+    async def start_unix(self, path):
+        self.server = await asyncio.start_unix_server(self._serve, path)
+        return self.server
+
+    async def start_tcp(self, host='127.0.0.1', port=0):
+        self.server = await asyncio.start_server(self._serve, host, port)
+        return self.server
+
+    async def _serve(self, reader, writer):
+        conn = _Connection(self, writer)
+        worker = asyncio.ensure_future(conn.process())
+        try:
+            while True:
+                try:
+                    length, kind = HEADER.unpack(await reader.readexactly(HEADER.size))
+                    payload = await reader.readexactly(length)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                try:
+                    await conn.handle(kind, payload)
+                except (ValueError, KeyError, struct.error) as e:
+                    writer.write(_message(ERROR, str(e).encode()))
+        finally:
+            worker.cancel()
+            for session_id in conn.owned:
+                self.sessions.pop(session_id, None)
+            writer.close()
+
+
+class _Connection:
+    """Per-connection state: owned sessions, the work queue and the delta writer."""
+    def __init__(self, server, writer):
+        self.server = server
+        self.writer = writer
+        self.owned = set()
+        self.ready = deque()           # Sessions with pending actions or a fresh state to send
+        self.work = asyncio.Event()    # Something is in `ready`
+        self.room = asyncio.Event()    # A full session drained (wakes the reader)
+
+    def _session(self, session_id):
+        if session_id not in self.owned:
+            raise KeyError(f"unknown session {session_id}")
+        return self.server.sessions[session_id]
+
+    def _schedule(self, session):
+        self.ready.append(session)
+        self.work.set()
+
+    async def handle(self, kind, payload):
+        server = self.server
+        if kind == ACTIONS:
+            (n,) = COUNT.unpack_from(payload)
+            for session_id, op, x, rot in ACTION.iter_unpack(payload[COUNT.size:COUNT.size + n * ACTION.size]):
+                session = self._session(session_id)
+                while len(session.pending) >= server.max_pending:
+                    self.room.clear()
+                    await self.room.wait() # Per-session backpressure
+                if not session.pending:
+                    self._schedule(session)
+                session.pending.append((op, x, rot))
+        elif kind == CREATE:
+            count, seed = CREATE_BODY.unpack(payload)
+            first = server.next_id
+            server.next_id += count
+            self.writer.write(_message(CREATED, CREATED_BODY.pack(first, count)))
+            for i in range(count):
+                session = Session(first + i, seed + i)
+                server.sessions[session.id] = session
+                self.owned.add(session.id)
+                self._schedule(session)
+        elif kind == RESET:
+            (n,) = COUNT.unpack_from(payload)
+            for session_id, seed in RESET_ENTRY.iter_unpack(payload[COUNT.size:COUNT.size + n * RESET_ENTRY.size]):
+                session = self._session(session_id)
+                session.game = TetrisGame(seed=seed)
+                session.pending.clear()
+                session.flags |= FLAG_RESET
+                self._schedule(session)
+        elif kind == CLOSE:
+            (n,) = COUNT.unpack_from(payload)
+            for (session_id,) in SESSION.iter_unpack(payload[COUNT.size:COUNT.size + n * SESSION.size]):
+                self._session(session_id)
+                self.owned.discard(session_id)
+                del server.sessions[session_id]
+        else:
+            raise ValueError(f"unknown message type {kind}")
+
+    async def process(self):
+        """
+        Applies queued actions session by session and sends the round's deltas,
+        MAX_COUNT sessions per DELTAS message. A session that fails is reported
+        with an ERROR message and left out of the round; the others go on.
+        """
+        batch = self.server.batch
+        while True:
+            await self.work.wait()
+            self.work.clear()
+            ready, self.ready = self.ready, deque()
+            out = bytearray(COUNT.size)
+            sent = set()
+            count = 0
+            for session in ready:
+                if session.id in sent or session.id not in self.owned:
+                    continue
+                sent.add(session.id)
+                try:
+                    pending = session.pending
+                    for _ in range(min(batch, len(pending))):
+                        session.apply(*pending.popleft())
+                    if pending:
+                        self._schedule(session) # More next round
+                    entry = bytearray()
+                    session.delta(entry)
+                except Exception as e:
+                    self.writer.write(_message(ERROR, f"session {session.id}: {e!r}".encode()))
+                    continue
+                out += entry
+                count += 1
+                if count == MAX_COUNT:
+                    await self._send_deltas(out, count)
+                    out = bytearray(COUNT.size)
+                    count = 0
+            if count:
+                await self._send_deltas(out, count)
+            self.room.set()
+            await asyncio.sleep(0) # Let the reader queue more
+
+    async def _send_deltas(self, out, count):
+        COUNT.pack_into(out, 0, count)
+        self.writer.write(_message(DELTAS, bytes(out)))
+        await self.writer.drain() # Client not reading -> stop applying actions
+
+
+class GameClient:
+    """Minimal asyncio client; keeps a mirror of every session's bitboard from the deltas."""
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.rows = {}   # session -> list of row masks
+        self.state = {}  # session -> (flags, piece, x, y, rot, hold, score, queue)
+        self.inbox = deque() # (kind, payload) read while waiting for another kind
+        self.bytes_received = 0
+
+    @classmethod
+    async def connect_unix(cls, path):
+        return cls(*await asyncio.open_unix_connection(path))
+
+    @classmethod
+    async def connect_tcp(cls, host, port):
+        return cls(*await asyncio.open_connection(host, port))
+
+    def _send(self, kind, payload):
+        self.writer.write(_message(kind, payload))
+
+    async def _read(self):
+        length, kind = HEADER.unpack(await self.reader.readexactly(HEADER.size))
+        payload = await self.reader.readexactly(length)
+        self.bytes_received += HEADER.size + length
+        if kind == ERROR:
+            raise RuntimeError(payload.decode())
+        return kind, payload
+
+    async def _read_kind(self, wanted):
+        """Payload of the next message of kind `wanted`; others are kept for later calls."""
+        for i, (kind, payload) in enumerate(self.inbox):
+            if kind == wanted:
+                del self.inbox[i]
+                return payload
+        while True:
+            kind, payload = await self._read()
+            if kind == wanted:
+                return payload
+            self.inbox.append((kind, payload))
+
+    def _send_counted(self, kind, entry, entries):
+        """Sends `entries` packed with struct `entry` as `kind` messages of at most MAX_COUNT entries."""
+        for start in range(0, len(entries), MAX_COUNT):
+            chunk = entries[start:start + MAX_COUNT]
+            body = bytearray(COUNT.pack(len(chunk)))
+            for fields in chunk:
+                body += entry.pack(*fields)
+            self._send(kind, bytes(body))
+
+    async def create(self, count, seed=0):
+        """
+        Creates `count` sessions (seeds seed, seed + 1, ...); returns their ids
+        (the initial deltas arrive with the next recv_deltas). More than
+        MAX_COUNT sessions are created with one CREATE per MAX_COUNT.
+        """
+        ids = []
+        for start in range(0, count, MAX_COUNT):
+            self._send(CREATE, CREATE_BODY.pack(min(MAX_COUNT, count - start), seed + start))
+            await self.writer.drain()
+            first, created = CREATED_BODY.unpack(await self._read_kind(CREATED))
+            ids.extend(range(first, first + created))
+        for session_id in ids:
+            self.rows[session_id] = [0] * TOTAL_HEIGHT
+        return ids
+
+    async def send_actions(self, actions):
+        """actions: iterable of (session, op, x, rot); split over several messages beyond MAX_COUNT."""
+        self._send_counted(ACTIONS, ACTION, list(actions))
+        await self.writer.drain()
+
+    async def reset(self, sessions_seeds):
+        """sessions_seeds: iterable of (session, seed); split over several messages beyond MAX_COUNT."""
+        self._send_counted(RESET, RESET_ENTRY, list(sessions_seeds))
+        await self.writer.drain()
+
+    async def recv_deltas(self):
+        """Reads one DELTAS message, applies it to the mirrors and returns the updated session ids."""
+        payload = await self._read_kind(DELTAS)
+        (n,) = COUNT.unpack_from(payload)
+        pos = COUNT.size
+        updated = []
+        for _ in range(n):
+            session_id, flags, piece, x, y, rot, hold, score = DELTA_HEAD.unpack_from(payload, pos)
+            pos += DELTA_HEAD.size
+            queue = tuple(payload[pos:pos + PREVIEW_SIZE])
+            pos += PREVIEW_SIZE
+            changed = payload[pos]
+            pos += 1
+            rows = self.rows.setdefault(session_id, [0] * TOTAL_HEIGHT)
+            for _ in range(changed):
+                index, mask = ROW.unpack_from(payload, pos)
+                pos += ROW.size
+                rows[index] = mask
+            self.state[session_id] = (flags, piece, x, y, rot, hold, score, queue)
+            updated.append(session_id)
+        return updated
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Headless Moca-Tris game server")
+    parser.add_argument('--unix', help="Unix socket path (default: TCP)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7777)
+    parser.add_argument('--max-pending', type=int, default=256)
+    args = parser.parse_args()
+
+    async def serve():
+        server = GameServer(max_pending=args.max_pending)
+        if args.unix:
+            listener = await server.start_unix(args.unix)
+        else:
+            listener = await server.start_tcp(args.host, args.port)
+        async with listener:
+            await listener.serve_forever()
+    asyncio.run(serve())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# Reachable Placement Generator
+# Breadth-first search over (x, y, rot) piece states using the real SRS kicks,
+# shifts and soft drop, so tucks, slides and kick-dependent T-spins are found.
+# Every distinct final footprint is returned once (O in 4 rotations and I/S/Z
+# in 2 fill the same cells), with the first path the search reaches it by.
+from collections import OrderedDict, deque
+
+from srs_data import *
+from piece_tables import PLACED_ROWS, get_kicks
+from tetris_core import (GRID_WIDTH, TOTAL_HEIGHT, SPAWN_X, SPAWN_Y,
+                         ACTION_LEFT, ACTION_RIGHT, ACTION_DOWN, ACTION_DROP,
+                         ACTION_ROTATE_R, ACTION_ROTATE_L)
+
+# Soft drop moves one row at a time near the stack, so shifts and rotations
+# are tried at every height there. Rows whose piece (and any kick of it,
+# at most KICK_ROWS down) cannot touch the stack behave alike, so in that open
+# air one soft-drop edge falls straight to the lowest of them (it expands to
+# repeated ACTION_DOWN in the path).
+KICK_ROWS = 2
+
+class Placement:
+    """One distinct way a piece can lock."""
+    __slots__ = ('x', 'y', 'rot', 'tspin', 'footprint', 'path')
+
+    def __init__(self, x, y, rot, tspin, footprint, path):
+        self.x = x                  # Final piece state (as TetrisGame.piece_x/y/rot at lock)
+        self.y = y
+        self.rot = rot
+        self.tspin = tspin          # 0 (None) or 2 (Normal), as TetrisGame._check_tspin
+        self.footprint = footprint  # ((row, row_mask), ...) of the locked cells
+        self.path = path            # Keypresses from spawn, ending with ACTION_DROP
+
+    def apply(self, game):
+        """Locks the game's current piece here in one call (see TetrisGame.place)."""
+        return game.place(SPAWN_X, ROT_0, spin_path=self.path[:-1])
+
+    def push(self, game):
+        """Locks it like apply(), but so that game.pop() takes it back (see TetrisGame.push_placement)."""
+        return game.push_placement(SPAWN_X, ROT_0, spin_path=self.path[:-1])
+
+    def __repr__(self):
+        return f"Placement(x={self.x}, y={self.y}, rot={self.rot}, tspin={self.tspin}, moves={len(self.path)})"
+
+
+class MoveGenerator:
+    """
+    Enumerates reachable lock positions for a piece on a board.
+    Results are memoized per (board, piece, start state); boards repeat
+    constantly while a bot re-plans, so the cache is bounded (LRU).
+    """
+    def __init__(self, cache_size=4096):
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def placements(self, game, use_hold=False):
+        """Placements for the game's current piece (or the piece hold would bring in)."""
+        p_type = game.piece_type
+        if use_hold:
+            p_type = game.hold_piece if game.hold_piece is not None else game.bag[0]
+        return self.generate(game.rows, p_type, board_hash=game.board_hash)
+
+    def generate(self, rows, p_type, start=(SPAWN_X, SPAWN_Y, ROT_0), board_hash=None):
+        """Returns the list of Placements for piece p_type starting at `start` on bitboard `rows`.
+        board_hash: Zobrist hash of `rows` if the caller has it (cheaper cache key than the rows)."""
+        key = (tuple(rows) if board_hash is None else board_hash, p_type, start)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return cached
+        self.misses += 1
+        result = self._search(rows, p_type, start)
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+    # --- Search ---
+
+    def _search(self, rows, p_type, start):
+        placed_rows = PLACED_ROWS[p_type]
+
+        def collides(x, y, rot):
+            placed = placed_rows[rot].get(x)
+            if placed is None:
+                return True
+            for ly, mask in placed:
+                by = y + ly
+                if by >= TOTAL_HEIGHT:
+                    return True
+                if by >= 0 and rows[by] & mask:
+                    return True
+            return False
+
+        lands = {} # (x, y, rot) -> landing row, shared by every state above it
+        def drop_y(x, y, rot):
+            land = lands.get((x, y, rot))
+            visited = []
+            while land is None:
+                visited.append(y)
+                if collides(x, y + 1, rot):
+                    land = y
+                else:
+                    y += 1
+                    land = lands.get((x, y, rot))
+            for vy in visited:
+                lands[(x, vy, rot)] = land
+            return land
+
+        sx, sy, srot = start
+        if collides(sx, sy, srot):
+            return []
+        top = next((y for y in range(TOTAL_HEIGHT) if rows[y]), TOTAL_HEIGHT)
+        open_air = top - 4 - KICK_ROWS # Lowest piece row clear of the stack, kicks included
+
+        # State = (x, y, rot, last_move_rotate). The rotate flag is part of the
+        # state because it decides whether the same cells lock as a T-spin.
+        track_spin = p_type == MINO_T
+        start_state = (sx, sy, srot, False)
+        parent = {start_state: None}
+        queue = deque([start_state])
+        results = {}
+        locked = set() # (x, land, rot, tspin) already turned into a result
+
+        while queue:
+            state = queue.popleft()
+            x, y, rot, spun = state
+
+            # Lock from here with a hard drop (does not reset the rotate flag)
+            land = drop_y(x, y, rot)
+            tspin = 2 if track_spin and spun and self._corners(rows, x, land) >= 3 else 0
+            if (x, land, rot, tspin) not in locked:
+                locked.add((x, land, rot, tspin))
+                footprint = tuple((land + ly, mask) for ly, mask in placed_rows[rot][x])
+                result_key = (footprint, tspin)
+                if result_key not in results:
+                    # BFS order: the first path found has the fewest moves (a free fall is one)
+                    results[result_key] = Placement(x, land, rot, tspin, footprint,
+                                                    self._build_path(parent, state))
+
+            for move in (ACTION_LEFT, ACTION_RIGHT, ACTION_DOWN, ACTION_ROTATE_R, ACTION_ROTATE_L):
+                if move == ACTION_LEFT or move == ACTION_RIGHT:
+                    nx = x - 1 if move == ACTION_LEFT else x + 1
+                    if collides(nx, y, rot):
+                        continue
+                    nxt = (nx, y, rot, False)
+                elif move == ACTION_DOWN:
+                    if land == y:
+                        continue
+                    nxt = (x, max(y + 1, min(land, open_air)), rot, spun if track_spin else False)
+                else:
+                    if p_type == MINO_O:
+                        continue
+                    direction = 1 if move == ACTION_ROTATE_R else -1
+                    new_rot = (rot + direction) % 4
+                    for dx, dy in get_kicks(p_type, rot, direction):
+                        if not collides(x + dx, y + dy, new_rot):
+                            nxt = (x + dx, y + dy, new_rot, track_spin)
+                            break
+                    else:
+                        continue
+                if nxt not in parent:
+                    parent[nxt] = (state, move)
+                    queue.append(nxt)
+
+        return list(results.values())
+
+    def _build_path(self, parent, state):
+        path = []
+        link = parent[state]
+        while link is not None:
+            prev, move = link
+            if move == ACTION_DOWN:
+                path.extend([ACTION_DOWN] * (state[1] - prev[1]))
+            else:
+                path.append(move)
+            state = prev
+            link = parent[state]
+        path.reverse()
+        path.append(ACTION_DROP)
+        return path
+
+    def _corners(self, rows, x, y):
+        """Occupied corners of the T's 3x3 box (walls and floor count)."""
+        occupied = 0
+        for dx, dy in ((0, 0), (2, 0), (0, 2), (2, 2)):
+            ck_x = x + dx
+            ck_y = y + dy
+            if ck_x < 0 or ck_x >= GRID_WIDTH or ck_y >= TOTAL_HEIGHT:
+                occupied += 1
+            elif ck_y >= 0 and (rows[ck_y] >> ck_x) & 1:
+                occupied += 1
+        return occupied
@@ -0,0 +1,144 @@
+# Parallel Beam Search
+# ParallelSmartBot runs SmartBot's beam search one ply at a time and splits
+# each ply's beam across a persistent process pool. The parent expands the
+# first piece (current piece and hold) itself; from then on the single shared
+# beam is cut into contiguous chunks, shipped in compact form (bitboard rows
+# as bytes), and every worker expands its entries and sends back its best
+# beam_width children. The parent merges them into the next beam, so the
+# whole search does the serial SmartBot's work, only spread over the workers.
+# Every job carries the same absolute time.monotonic() deadline, so a queued
+# or slow job cannot stretch the time budget.
+# Chunks are merged in beam order and a duplicate position only replaces an
+# earlier one when strictly better, so the plan never depends on which worker
+# finishes first.
+import multiprocessing as mp
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from tetris_core import TetrisGame
+from ai_logic import SmartBot, PREVIEW_SIZE
+
+# --- Worker side ---
+
+_worker_bot = None
+
+def _init_worker(options):
+    global _worker_bot
+    _worker_bot = SmartBot(**options)
+
+def _warm_up(seed):
+    """First search in a fresh worker: imports, tables and caches."""
+    _worker_bot.search(TetrisGame(seed=seed))
+    return os.getpid()
+
+def _pack(entry, first):
+    value, lines_value, rows, board_hash, hold, pos, _ = entry
+    return value, lines_value, array('H', rows).tobytes(), board_hash, hold, pos, first
+
+def _unpack(entry):
+    value, lines_value, data, board_hash, hold, pos, first = entry
+    rows = array('H')
+    rows.frombytes(data)
+    return value, lines_value, tuple(rows), board_hash, hold, pos, first
+
+def _expand_chunk(bot, queue, entries, ply, deadline):
+    """
+    Expands packed beam entries (their first-moves slot holds their index in
+    the beam) by one piece. Returns (best beam_width children packed, nodes),
+    or None if `deadline` (time.monotonic()) passed first.
+    """
+    nodes = bot.nodes
+    children = {}
+    pending = [] if bot.batch_evaluator is not None else None # The whole chunk in one scoring pass
+    for entry in entries:
+        if bot._expand_entry(queue, _unpack(entry), ply, children, deadline=deadline, pending=pending) is None:
+            return None
+    bot._add_pending(children, pending)
+    best = sorted(children.values(), key=lambda entry: entry[0], reverse=True)[:bot.beam_width]
+    return [_pack(entry, entry[6]) for entry in best], bot.nodes - nodes
+
+def _worker_expand(queue, entries, ply, deadline):
+    if ply == 1:
+        _worker_bot.transpositions.new_search()
+    return _expand_chunk(_worker_bot, queue, entries, ply, deadline)
+
+
+class ParallelSmartBot(SmartBot):
+    """
+    SmartBot whose searches deeper than one piece split every ply's beam across
+    `workers` processes (default: one per CPU; 0 = the same split in this process).
+      start_method -- multiprocessing start method of the pool
+    Plans are the serial SmartBot's (up to the order of equal-valued children).
+    The pool is started and warmed up (one search per worker) in the constructor,
+    so the first move is as fast as the rest. Call close() when done.
+    node_budget only applies to the first piece here; bound searches with time_budget.
+    Other options are SmartBot's.
+    """
+    def __init__(self, workers=None, start_method='spawn', **options):
+        super().__init__(**options)
+        self.workers = os.cpu_count() if workers is None else workers
+        self.executor = None
+        if self.workers:
+            self.executor = ProcessPoolExecutor(self.workers, mp_context=mp.get_context(start_method),
+                                                initializer=_init_worker, initargs=(self._worker_options(),))
+            for future in [self.executor.submit(_warm_up, seed) for seed in range(self.workers)]:
+                future.result()
+
+    def _worker_options(self):
+        """SmartBot options of the worker bots (their searches are bounded per job, not per bot)."""
+        return {'beam_width': self.beam_width, 'depth': self.depth, 'use_hold': self.use_hold,
+                'batch_eval': self.batch_evaluator is not None, 'weights': self.get_weights()}
+
+    def _beam_search(self, game, depth, deadline=None, partial=False):
+        if depth <= 1:
+            return super()._beam_search(game, depth, deadline, partial)
+        queue = [game.piece_type] + game.bag[:PREVIEW_SIZE]
+        start = [(0, 0, tuple(game.rows), game.board_hash, game.hold_piece, 0, None)]
+        found = self._run_beam(queue, start, 0, 1, game.hold_used, deadline)
+        if found is None:
+            return None
+        beam, plies = found
+        if not plies:
+            return [], 0, 0
+
+        for ply in range(1, min(depth, len(queue))):
+            packed = [_pack(entry, i) for i, entry in enumerate(beam)]
+            count = min(len(packed), max(1, self.workers))
+            chunks = [packed[len(packed) * i // count:len(packed) * (i + 1) // count] for i in range(count)]
+            if self.executor is None:
+                outcomes = [_expand_chunk(self, queue, chunk, ply, deadline) for chunk in chunks]
+            else:
+                futures = [self.executor.submit(_worker_expand, queue, chunk, ply, deadline) for chunk in chunks]
+                outcomes = [future.result() for future in futures]
+                self.nodes += sum(outcome[1] for outcome in outcomes if outcome is not None)
+            if any(outcome is None for outcome in outcomes):
+                return None
+
+            # Deterministic merge in beam order; children point back at their beam entry
+            children = {}
+            for best, _ in outcomes:
+                for entry in best:
+                    entry = _unpack(entry)
+                    key = entry[3:6]
+                    known = children.get(key)
+                    if known is None or entry[0] > known[0]:
+                        children[key] = entry[:6] + (beam[entry[6]][6],)
+            if not children:
+                break
+            beam = sorted(children.values(), key=lambda entry: entry[0], reverse=True)[:self.beam_width]
+            plies += 1
+        moves = list(beam[0][6]) if beam[0][6] is not None else []
+        return moves, beam[0][0], plies
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,65 @@
+# Compiled Piece Tables
+# Everything the innermost loops need about a (piece, rotation), computed once
+# at import from srs_data so collision tests and rotations never rebuild it.
+# All tables are indexed as TABLE[piece_type][rot] (piece_type 1-7, index 0 unused).
+from srs_data import *
+
+GRID_WIDTH = 10 # Mirrors tetris_core.GRID_WIDTH (tetris_core imports this module)
+
+PIECE_TYPES = (MINO_I, MINO_J, MINO_L, MINO_O, MINO_S, MINO_T, MINO_Z)
+
+def _per_piece(build):
+    """Builds [None, table(piece 1), ..., table(piece 7)] where table(p) is a tuple over rotations."""
+    table = [None] * 8
+    for p_type in PIECE_TYPES:
+        table[p_type] = tuple(build(p_type, rot) for rot in range(4))
+    return table
+
+def _cells(p_type, rot):
+    return tuple(SHAPES[p_type][rot])
+
+def _bounds(p_type, rot):
+    xs = [lx for lx, _ in SHAPES[p_type][rot]]
+    ys = [ly for _, ly in SHAPES[p_type][rot]]
+    return (min(xs), max(xs), min(ys), max(ys))
+
+def _row_masks(p_type, rot):
+    masks = {}
+    for lx, ly in SHAPES[p_type][rot]:
+        masks[ly] = masks.get(ly, 0) | (1 << lx)
+    return tuple(sorted(masks.items()))
+
+# Local cells: ((lx, ly), ...) exactly as in SHAPES
+CELLS = _per_piece(_cells)
+
+# Bounding box of the local cells: (min_lx, max_lx, min_ly, max_ly)
+BOUNDS = _per_piece(_bounds)
+
+# Local row masks: ((ly, mask), ...) top to bottom, bit lx = local column lx
+ROW_MASKS = _per_piece(_row_masks)
+
+# Legal piece_x range (every cell inside the walls)
+MIN_X = _per_piece(lambda p, r: -BOUNDS[p][r][0])
+MAX_X = _per_piece(lambda p, r: GRID_WIDTH - 1 - BOUNDS[p][r][1])
+
+# Row masks already shifted to board columns for every legal x:
+# PLACED_ROWS[p][rot][x] -> ((ly, board_mask), ...). Illegal x are absent,
+# so a failed lookup doubles as the wall test.
+PLACED_ROWS = _per_piece(lambda p, r: {
+    x: tuple((ly, mask << x if x >= 0 else mask >> -x) for ly, mask in ROW_MASKS[p][r])
+    for x in range(MIN_X[p][r], MAX_X[p][r] + 1)
+})
+
+def _kicks(p_type, rot, direction):
+    if p_type == MINO_O:
+        return () # O does not rotate
+    table = SRS_I if p_type == MINO_I else SRS_JLSTZ
+    return tuple(table.get((rot, (rot + direction) % 4), [(0, 0)]))
+
+# SRS kick tests for rotating out of `rot`: ((dx, dy), ...), test 1 is (0, 0)
+KICKS_CW = _per_piece(lambda p, r: _kicks(p, r, 1))
+KICKS_CCW = _per_piece(lambda p, r: _kicks(p, r, -1))
+
+def get_kicks(p_type, rot, direction):
+    """Kick tests for a rotation. direction: 1 for CW (Right), -1 for CCW (Left)."""
+    return KICKS_CW[p_type][rot] if direction == 1 else KICKS_CCW[p_type][rot]
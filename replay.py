@@ -0,0 +1,250 @@
+# Match Replays
+# A replay is the game's seeds and rule config plus a compact event stream:
+# every event is varint(frames since the previous event) followed by one code
+# byte (a TetrisGame.step action, or GARBAGE + varint(lines) for attacks
+# received). Time only passes in whole frames of FRAME_MS (TetrisGame.advance),
+# so a replay re-simulates exactly (the ms timers only up to float rounding,
+# which advance() tolerates). Keyframe snapshots every
+# `keyframe_interval` frames let the player seek without replaying from frame 0.
+#
+# File layout (all integers are unsigned LEB128 varints):
+#   MAGIC, header length, header (JSON: version, seeds, rule config, frames)
+#   event stream length, event stream
+#   keyframe count, then per keyframe: frame, last event frame, stream offset,
+#   and the packed GameSnapshot (rows, colors, bag, clearing lines, JSON state)
+import json
+from bisect import bisect_right
+
+from tetris_core import TetrisGame, GameSnapshot, FRAME_MS
+from sequences import PieceSequence, GarbageSequence
+
+MAGIC = b'MTRP'
+VERSION = 1
+GARBAGE = 0x80 # Event code: garbage lines added to the queue (varint count follows)
+DEFAULT_KEYFRAME_INTERVAL = 60 * 60 # One keyframe per minute of play
+
+# --- Varints ---
+
+def write_varint(out, value):
+    """Appends unsigned `value` to bytearray `out` (7 bits per byte, LEB128)."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, pos):
+    """Returns (value, position after it)."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def _write_blob(out, blob):
+    write_varint(out, len(blob))
+    out += blob
+
+def _read_blob(data, pos):
+    size, pos = read_varint(data, pos)
+    return bytes(data[pos:pos + size]), pos + size
+
+# --- Keyframes ---
+
+class Keyframe:
+    __slots__ = ('frame', 'event_frame', 'offset', 'snapshot')
+
+    def __init__(self, frame, event_frame, offset, snapshot):
+        self.frame = frame              # Game time of the snapshot
+        self.event_frame = event_frame  # Frame of the last event before `offset` (deltas are relative to it)
+        self.offset = offset            # Position in the event stream of the next event
+        self.snapshot = snapshot        # GameSnapshot
+
+def _pack_snapshot(out, snap):
+    _write_blob(out, snap.rows)
+    _write_blob(out, snap.colors)
+    _write_blob(out, bytes(snap.bag))
+    _write_blob(out, bytes(snap.clearing_lines))
+    _write_blob(out, json.dumps([list(snap.state), list(snap.sequence_seeds)]).encode())
+
+def _unpack_snapshot(data, pos):
+    rows, pos = _read_blob(data, pos)
+    colors, pos = _read_blob(data, pos)
+    bag, pos = _read_blob(data, pos)
+    clearing_lines, pos = _read_blob(data, pos)
+    state, pos = _read_blob(data, pos)
+    state, seeds = json.loads(state)
+    return GameSnapshot(rows, colors, tuple(bag), tuple(clearing_lines), tuple(state), tuple(seeds)), pos
+
+
+class Replay:
+    """A recorded match: header, event stream and keyframes (see module comment)."""
+    def __init__(self, header, events=b'', keyframes=()):
+        self.header = header
+        self.events = bytes(events)
+        self.keyframes = list(keyframes)
+
+    @property
+    def frames(self):
+        """Length of the match in frames."""
+        return self.header['frames']
+
+    def new_game(self):
+        """A game with the seeds and rule config of the recorded one, at frame 0."""
+        h = self.header
+        game = TetrisGame(seed=h['seed'], pieces=PieceSequence(h['piece_seed']),
+                          garbage=GarbageSequence(h['garbage_seed']))
+        game.fall_speed = h['fall_speed']
+        game.clear_anim_duration = h['clear_anim_duration']
+        return game
+
+    def to_bytes(self):
+        out = bytearray(MAGIC)
+        _write_blob(out, json.dumps(self.header, sort_keys=True).encode())
+        _write_blob(out, self.events)
+        write_varint(out, len(self.keyframes))
+        for kf in self.keyframes:
+            write_varint(out, kf.frame)
+            write_varint(out, kf.event_frame)
+            write_varint(out, kf.offset)
+            _pack_snapshot(out, kf.snapshot)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("not a Moca-Tris replay")
+        pos = len(MAGIC)
+        header, pos = _read_blob(data, pos)
+        header = json.loads(header)
+        if header.get('version') != VERSION:
+            raise ValueError(f"unsupported replay version {header.get('version')}")
+        events, pos = _read_blob(data, pos)
+        count, pos = read_varint(data, pos)
+        keyframes = []
+        for _ in range(count):
+            frame, pos = read_varint(data, pos)
+            event_frame, pos = read_varint(data, pos)
+            offset, pos = read_varint(data, pos)
+            snap, pos = _unpack_snapshot(data, pos)
+            keyframes.append(Keyframe(frame, event_frame, offset, snap))
+        return cls(header, events, keyframes)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+class ReplayRecorder:
+    """
+    Drives a TetrisGame and records everything that happens to it.
+    Use step(action) instead of game.step, advance(frames) instead of
+    game.update/advance, and add_garbage(lines) instead of game.garbage_queue += lines.
+    """
+    def __init__(self, game, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        self.game = game
+        self.keyframe_interval = keyframe_interval
+        self.frame = 0        # Frames recorded so far
+        self.events = bytearray()
+        self.event_frame = 0  # Frame of the last event
+        self.keyframes = [Keyframe(0, 0, 0, game.snapshot())]
+        self.header = {
+            'version': VERSION,
+            'seed': game.seed,
+            'piece_seed': game.pieces.seed,
+            'garbage_seed': game.garbage.seed,
+            'fall_speed': game.fall_speed,
+            'clear_anim_duration': game.clear_anim_duration,
+            'frame_ms': FRAME_MS,
+            'keyframe_interval': keyframe_interval,
+        }
+
+    def _event(self, code):
+        write_varint(self.events, self.frame - self.event_frame)
+        self.events.append(code)
+        self.event_frame = self.frame
+
+    def step(self, action):
+        self._event(action)
+        self.game.step(action)
+
+    def add_garbage(self, lines):
+        if lines <= 0:
+            return
+        self._event(GARBAGE)
+        write_varint(self.events, lines)
+        self.game.garbage_queue += lines
+
+    def advance(self, frames=1):
+        """Lets `frames` frames of gravity and clear animation pass, keyframing on the way."""
+        game = self.game
+        while frames > 0:
+            to_keyframe = self.keyframe_interval - self.frame % self.keyframe_interval
+            chunk = min(frames, to_keyframe)
+            game.advance(chunk)
+            self.frame += chunk
+            frames -= chunk
+            if chunk == to_keyframe:
+                self.keyframes.append(Keyframe(self.frame, self.event_frame, len(self.events), game.snapshot()))
+
+    def replay(self):
+        """The recording so far as a Replay."""
+        header = dict(self.header, frames=self.frame)
+        return Replay(header, self.events, self.keyframes)
+
+
+class ReplayPlayer:
+    """Re-simulates a Replay headless; seek() jumps to any frame from the nearest keyframe."""
+    def __init__(self, replay):
+        self.replay = replay
+        self.game = replay.new_game()
+        self._keyframe_frames = [kf.frame for kf in replay.keyframes]
+        self._start(replay.keyframes[0])
+
+    def _start(self, kf):
+        self.game.restore(kf.snapshot)
+        self.frame = kf.frame
+        self.event_frame = kf.event_frame
+        self.pos = kf.offset
+
+    def seek(self, frame):
+        """Moves to `frame` (backwards or forwards) and returns the game there."""
+        frame = min(frame, self.replay.frames)
+        kf = self.replay.keyframes[bisect_right(self._keyframe_frames, frame) - 1]
+        if frame < self.frame or kf.frame > self.frame:
+            self._start(kf)
+        return self.play_to(frame)
+
+    def play_to(self, frame):
+        """Plays forward to `frame`, applying every event recorded up to and including it."""
+        game = self.game
+        events = self.replay.events
+        while self.pos < len(events):
+            delta, pos = read_varint(events, self.pos)
+            at = self.event_frame + delta
+            if at > frame:
+                break
+            if at > self.frame:
+                game.advance(at - self.frame)
+                self.frame = at
+            code = events[pos]
+            pos += 1
+            if code == GARBAGE:
+                lines, pos = read_varint(events, pos)
+                game.garbage_queue += lines
+            else:
+                game.step(code)
+            self.event_frame = at
+            self.pos = pos
+        if frame > self.frame:
+            game.advance(frame - self.frame)
+            self.frame = frame
+        return game
@@ -0,0 +1,100 @@
+# Deterministic Piece & Garbage Streams
+# Every TetrisGame draws its pieces and garbage holes from these seeded,
+# append-only sequences instead of the global `random` module, so a game is
+# reproducible from its seed and never perturbs another game's stream.
+# A game only keeps its read position, so one sequence can be shared by any
+# number of games (same pieces / same garbage for fair comparisons).
+import random
+
+from piece_tables import GRID_WIDTH, PIECE_TYPES
+
+CHUNK_BAGS = 256 # 7-bags generated per refill (bulk generation)
+CHUNK_ROWS = 1024 # Garbage rows generated per refill
+GARBAGE_CHANGE = 0.3 # Chance the hole moves after each garbage row (Puyo Tetris rule)
+
+def new_seed():
+    """A fresh 64-bit seed (for games created without one)."""
+    return random.SystemRandom().getrandbits(64)
+
+
+class PieceSequence:
+    """
+    Endless 7-bag piece stream: pieces[i] is the i-th piece ever dealt.
+    Generated lazily in chunks of CHUNK_BAGS bags; call pregenerate() to
+    pay for a long sequence up front.
+    """
+    def __init__(self, seed):
+        self.seed = seed
+        self._rng = random.Random(f"pieces:{seed}")
+        self.pieces = []
+
+    def pregenerate(self, count):
+        """Makes sure at least `count` pieces exist."""
+        rng = self._rng
+        pieces = self.pieces
+        while len(pieces) < count:
+            for _ in range(CHUNK_BAGS):
+                bag = list(PIECE_TYPES)
+                rng.shuffle(bag)
+                pieces.extend(bag)
+
+    def take(self, start, count):
+        """Pieces [start, start + count) as a new list."""
+        if start + count > len(self.pieces):
+            self.pregenerate(start + count)
+        return self.pieces[start:start + count]
+
+    def __len__(self):
+        return len(self.pieces)
+
+    def __getstate__(self):
+        # Only the seed: the pieces are regenerated identically on load
+        return {'seed': self.seed, 'length': len(self.pieces)}
+
+    def __setstate__(self, state):
+        self.__init__(state['seed'])
+        self.pregenerate(state['length'])
+
+
+class GarbageSequence:
+    """
+    Endless stream of garbage rows: row i has its hole in holes[i].
+    A batch of garbage keeps the hole of its previous row unless moves[i]
+    is set (GARBAGE_CHANGE chance); the first row of a batch always uses holes[i].
+    """
+    def __init__(self, seed):
+        self.seed = seed
+        self._rng = random.Random(f"garbage:{seed}")
+        self.holes = []
+        self.moves = []
+
+    def pregenerate(self, count):
+        """Makes sure at least `count` garbage rows exist."""
+        rng = self._rng
+        while len(self.holes) < count:
+            self.holes.extend([rng.randrange(GRID_WIDTH) for _ in range(CHUNK_ROWS)])
+            self.moves.extend([rng.random() < GARBAGE_CHANGE for _ in range(CHUNK_ROWS)])
+
+    def take(self, start, count):
+        """Hole columns of garbage rows [start, start + count) received as one batch."""
+        if start + count > len(self.holes):
+            self.pregenerate(start + count)
+        holes = self.holes
+        moves = self.moves
+        hole_x = holes[start]
+        batch = []
+        for i in range(start, start + count):
+            if moves[i]:
+                hole_x = holes[i]
+            batch.append(hole_x)
+        return batch
+
+    def __len__(self):
+        return len(self.holes)
+
+    def __getstate__(self):
+        return {'seed': self.seed, 'length': len(self.holes)}
+
+    def __setstate__(self, state):
+        self.__init__(state['seed'])
+        self.pregenerate(state['length'])
@@ -0,0 +1,129 @@
+# Live State Export (memory-mapped)
+# Mirrors one TetrisGame into a small memory-mapped file every frame so an
+# external agent or tool can read it at frame rate without any serialization,
+# and lets it send actions back through a ring buffer in the same file.
+#
+# File layout (little-endian, fixed offsets):
+#   0   HEADER   magic 'MTST', version:u16, ring capacity:u16
+#   8   seq:u32  seqlock: odd while the state below is being written
+#   12  STATE    frame:u32 score:u32 garbage_queue:u16 piece:u8 x:i8 y:i8 rot:u8
+#                hold:u8 hold_used:u8 game_over:u8 queue:u8[PREVIEW_SIZE] (pad to 4)
+#                rows:u16[TOTAL_HEIGHT] (bitboard) grid:u8[TOTAL_HEIGHT * GRID_WIDTH] (colors)
+#   ...  RING    head:u32 (written by the agent) tail:u32 (written by the game)
+#                actions:u8[capacity]; action i lives at actions[i % capacity]
+# Readers: read seq, copy the state, read seq again; retry if it changed or was odd.
+# Writers of actions: store actions[head % capacity], then bump head (if head - tail < capacity).
+import mmap
+import os
+import struct
+import time
+
+from tetris_core import TOTAL_HEIGHT, GRID_WIDTH
+from ai_logic import PREVIEW_SIZE
+
+MAGIC = b'MTST'
+VERSION = 1
+HEADER = struct.Struct('<4sHH')
+SEQ = struct.Struct('<I')
+STATE = struct.Struct(f'<IIHBbbBBBB{PREVIEW_SIZE}sx{TOTAL_HEIGHT}H{TOTAL_HEIGHT * GRID_WIDTH}s')
+RING_HEAD = struct.Struct('<II')
+
+SEQ_OFFSET = HEADER.size
+STATE_OFFSET = SEQ_OFFSET + SEQ.size
+RING_OFFSET = (STATE_OFFSET + STATE.size + 3) & ~3
+ACTIONS_OFFSET = RING_OFFSET + RING_HEAD.size
+DEFAULT_CAPACITY = 64
+
+STATE_FIELDS = ('frame', 'score', 'garbage_queue', 'piece', 'x', 'y', 'rot', 'hold', 'hold_used',
+                'game_over', 'queue', 'rows', 'grid')
+
+def file_size(capacity=DEFAULT_CAPACITY):
+    return ACTIONS_OFFSET + capacity
+
+
+class StateExporter:
+    """Game side: publish(game) once per frame, poll_actions() for actions sent back."""
+    def __init__(self, path, capacity=DEFAULT_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        size = file_size(capacity)
+        with open(path, 'wb') as f:
+            f.write(bytes(size))
+        self._file = open(path, 'r+b')
+        self.map = mmap.mmap(self._file.fileno(), size)
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, capacity)
+        self.seq = 0
+        self.frame = 0
+
+    def publish(self, game):
+        """Writes the game's current state under the seqlock."""
+        m = self.map
+        self.seq += 1
+        SEQ.pack_into(m, SEQ_OFFSET, self.seq) # Odd: write in progress
+        queue = bytes(game.bag[:PREVIEW_SIZE])
+        STATE.pack_into(m, STATE_OFFSET, self.frame, game.score & 0xFFFFFFFF, min(game.garbage_queue, 0xFFFF),
+                        game.piece_type, game.piece_x, game.piece_y, game.piece_rot,
+                        game.hold_piece or 0, game.hold_used, game.game_over, queue,
+                        *game.rows, bytes(c for row in game.colors for c in row))
+        self.seq += 1
+        SEQ.pack_into(m, SEQ_OFFSET, self.seq) # Even: consistent
+        self.frame += 1
+
+    def poll_actions(self):
+        """Returns the actions the agent queued since the last call (oldest first)."""
+        head, tail = RING_HEAD.unpack_from(self.map, RING_OFFSET)
+        if head == tail:
+            return []
+        actions = [self.map[ACTIONS_OFFSET + i % self.capacity] for i in range(tail, head)]
+        struct.pack_into('<I', self.map, RING_OFFSET + 4, head)
+        return actions
+
+    def close(self):
+        self.map.close()
+        self._file.close()
+
+
+class StateReader:
+    """Agent side (Python): read() the latest consistent state, send(action) to the game."""
+    def __init__(self, path):
+        self._file = open(path, 'r+b')
+        self.map = mmap.mmap(self._file.fileno(), 0)
+        magic, version, self.capacity = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} state export")
+
+    def read(self):
+        """Returns the state as a dict (STATE_FIELDS), retrying while the game is writing."""
+        m = self.map
+        while True:
+            seq = SEQ.unpack_from(m, SEQ_OFFSET)[0]
+            if seq & 1:
+                time.sleep(0)
+                continue
+            values = STATE.unpack_from(m, STATE_OFFSET)
+            if SEQ.unpack_from(m, SEQ_OFFSET)[0] == seq:
+                break
+        state = dict(zip(STATE_FIELDS[:11], values[:11]))
+        state['queue'] = list(state['queue'])
+        state['rows'] = list(values[11:11 + TOTAL_HEIGHT])
+        state['grid'] = values[-1]
+        state['seq'] = seq
+        return state
+
+    def send(self, action):
+        """Queues one action (TetrisGame.step code). Returns False if the ring is full."""
+        head, tail = RING_HEAD.unpack_from(self.map, RING_OFFSET)
+        if head - tail >= self.capacity:
+            return False
+        self.map[ACTIONS_OFFSET + head % self.capacity] = action
+        struct.pack_into('<I', self.map, RING_OFFSET, head + 1)
+        return True
+
+    def close(self):
+        self.map.close()
+        self._file.close()
+
+
+def default_paths(directory, players=2):
+    """File per player: <directory>/mocatris_p1.state, ..."""
+    return [os.path.join(directory, f'mocatris_p{i + 1}.state') for i in range(players)]
@@ -0,0 +1,36 @@
+# TetrisGame.advance(n) must land on the same state as n calls of update(FRAME_MS).
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tetris_core import TetrisGame, FRAME_MS
+
+
+def _state(game):
+    return (game.rows[:], game.piece_type, game.piece_x, game.piece_y, game.piece_rot, game.score,
+            game.in_clear_anim, game.game_over, round(game.fall_timer, 6), round(game.clear_timer, 6))
+
+
+@pytest.mark.parametrize('fall_speed', [800, 500, 100, 50, 16, 1000 / 60])
+@pytest.mark.parametrize('frames', [1, 47, 48, 49, 96, 300, 2000])
+def test_advance_matches_updates(fall_speed, frames):
+    stepped, jumped = TetrisGame(seed=3), TetrisGame(seed=3)
+    for game in (stepped, jumped):
+        game.fall_speed = fall_speed
+    for _ in range(frames):
+        stepped.update(FRAME_MS)
+    left = jumped.advance(frames)
+    assert _state(jumped) == _state(stepped)
+    assert left == 0 or jumped.game_over
+
+
+def test_advance_in_chunks_matches_updates():
+    stepped, jumped = TetrisGame(seed=5), TetrisGame(seed=5)
+    for chunk in [1, 2, 3, 5, 8, 13, 21, 34, 55, 89] * 4:
+        for _ in range(chunk):
+            stepped.update(FRAME_MS)
+        jumped.advance(chunk)
+        assert _state(jumped) == _state(stepped)
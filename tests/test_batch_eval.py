@@ -0,0 +1,49 @@
+# SmartBot(batch_eval=True) must plan exactly like the scalar scoring path, and
+# BatchEvaluator must score boards like SmartBot._static_score.
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('numpy')
+
+from tetris_core import TetrisGame
+from ai_logic import SmartBot
+
+
+def _plans(batch_eval, pieces=40, seed=5):
+    game = TetrisGame(seed=seed)
+    bot = SmartBot(beam_width=4, depth=3, use_hold=True, batch_eval=batch_eval)
+    plans = []
+    while len(plans) < pieces and not game.game_over:
+        result = bot.search(game)
+        plans.append((result.moves, result.value))
+        for action in result.moves:
+            game.step(action)
+        while game.in_clear_anim:
+            game.update(game.clear_anim_duration)
+    return plans, bot
+
+
+def test_batch_plans_match_scalar():
+    scalar, _ = _plans(False)
+    batched, _ = _plans(True)
+    assert batched == scalar
+
+
+def test_static_scores_match_scalar():
+    bot = SmartBot(batch_eval=True)
+    game = TetrisGame(seed=9)
+    boards = []
+    while len(boards) < 500 and not game.game_over:
+        rows = tuple(game.rows)
+        boards += [bot._apply_placement(rows, placement)[0] for placement in bot.movegen.placements(game)]
+        for action in bot.search(game).moves:
+            game.step(action)
+        while game.in_clear_anim:
+            game.update(game.clear_anim_duration)
+    assert bot.batch_evaluator.static_scores(boards).tolist() == [bot._static_score(rows) for rows in boards]
+    empty = tuple(TetrisGame(seed=9).rows)
+    assert bot.batch_evaluator.static_scores([empty]).tolist() == [bot._static_score(empty)]
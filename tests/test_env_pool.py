@@ -0,0 +1,39 @@
+# TetrisEnvPool must surface worker failures instead of hanging.
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip('numpy')
+
+from env_pool import TetrisEnvPool
+
+
+def test_recv_without_stepping_workers_raises():
+    with TetrisEnvPool(4, num_workers=2) as pool:
+        pool.reset()
+        with pytest.raises(RuntimeError):
+            pool.recv()
+
+
+def test_worker_exception_is_reraised_and_pool_survives():
+    actions = np.zeros(4, dtype=np.int64)
+    with TetrisEnvPool(4, num_workers=2) as pool:
+        with pytest.raises(AttributeError): # step() before reset()
+            pool.step(actions)
+        pool.send(actions, [0])
+        with pytest.raises(AttributeError):
+            pool.recv(timeout=10)
+        pool.send(actions)
+        with pytest.raises(AttributeError): # Collected by reset() waiting for the async step
+            pool.reset()
+        pool.reset()
+        obs, rewards, terminated, truncated = pool.step(actions)
+        assert obs.shape == (4, pool.obs_size)
+        pool.send(actions)
+        workers = []
+        while len(workers) < pool.num_workers:
+            workers += pool.recv(timeout=10)[0]
+        assert sorted(workers) == list(range(pool.num_workers))
@@ -0,0 +1,44 @@
+# GameClient must split requests larger than one u16-counted message.
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_server
+from game_server import GameServer, GameClient, OP_PLACE
+from tetris_core import TetrisGame
+from ai_logic import PREVIEW_SIZE
+
+
+async def _drive(sessions):
+    server = GameServer()
+    listener = await server.start_tcp(port=0)
+    port = listener.sockets[0].getsockname()[1]
+    client = await GameClient.connect_tcp('127.0.0.1', port)
+    ids = await client.create(sessions, seed=3)
+    updated = set()
+    while len(updated) < sessions:
+        updated.update(await client.recv_deltas())
+    queues = [client.state[s][7] for s in ids]
+    await client.send_actions((s, OP_PLACE, 4, 0) for s in ids)
+    updated = set()
+    while len(updated) < sessions:
+        updated.update(await client.recv_deltas())
+    await client.reset([(s, 5) for s in ids])
+    updated = set()
+    while len(updated) < sessions:
+        updated.update(await client.recv_deltas())
+    await client.close()
+    listener.close()
+    await listener.wait_closed()
+    return ids, queues, server
+
+
+def test_requests_beyond_max_count_are_split(monkeypatch):
+    monkeypatch.setattr(game_server, 'MAX_COUNT', 7)
+    ids, queues, server = asyncio.run(_drive(30))
+    assert len(set(ids)) == 30
+    assert server.next_id == 31
+    # Session i of one create() call is seeded seed + i, across the split CREATE messages
+    assert queues == [tuple(TetrisGame(seed=3 + i).bag[:PREVIEW_SIZE]) for i in range(30)]
@@ -0,0 +1,29 @@
+# TetrisGame.grid must be a read-only view that follows the game.
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tetris_core import TetrisGame, TOTAL_HEIGHT, GRID_WIDTH, ACTION_DROP
+
+
+def test_grid_is_read_only():
+    game = TetrisGame(seed=2)
+    grid = game.grid
+    with pytest.raises(TypeError):
+        grid[TOTAL_HEIGHT - 1][0] = 8
+    with pytest.raises(TypeError):
+        grid[0] = (8,) * GRID_WIDTH
+    assert not any(any(row) for row in game.colors)
+
+
+def test_grid_follows_the_game():
+    game = TetrisGame(seed=2)
+    grid = game.grid
+    game.step(ACTION_DROP)
+    assert len(grid) == TOTAL_HEIGHT
+    assert [list(row) for row in grid] == game.colors
+    assert list(grid[-2:]) == [tuple(row) for row in game.colors[-2:]]
+    assert any(grid[TOTAL_HEIGHT - 1])
@@ -0,0 +1,104 @@
+# MoveGenerator must find every lock position a row-by-row search finds, and
+# every path it returns must lead there when played key by key.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import movegen
+from movegen import MoveGenerator
+from piece_tables import PIECE_TYPES
+from srs_data import MINO_T
+from tetris_core import TetrisGame, GRID_WIDTH, TOTAL_HEIGHT, FULL_ROW, SNAPSHOT_FIELDS
+from zobrist import hash_rows
+from ai_logic import SmartBot
+
+
+def _built(seed, masks):
+    """Snapshot of a fresh game whose board is `masks` ({row: row_mask}, garbage colored)."""
+    game = TetrisGame(seed=seed)
+    for y, mask in masks.items():
+        game.rows[y] = mask
+        game.colors[y] = [8 if mask >> x & 1 else 0 for x in range(GRID_WIDTH)]
+    game._rebuild_stats()
+    game.board_hash = hash_rows(game.rows)
+    return game.snapshot()
+
+
+def _tspin_slot():
+    """A T piece (seed 3 spawns one) over a T-spin double slot under an overhang."""
+    return _built(3, {TOTAL_HEIGHT - 3: 0b1111, TOTAL_HEIGHT - 2: FULL_ROW & ~0b111000,
+                      TOTAL_HEIGHT - 1: FULL_ROW & ~0b10000})
+
+
+def _side_cave():
+    """A cave in columns 0-6 that a piece can only enter by stopping mid-fall in the shaft of columns 7-9."""
+    left = 0b1111111
+    return _built(21, {TOTAL_HEIGHT - 5: left, TOTAL_HEIGHT - 2: left, TOTAL_HEIGHT - 1: left})
+
+
+def _boards(count=12, seed=21):
+    """Two tuck boards and the spawn positions of a bot-played seeded game with garbage coming in."""
+    boards = [_tspin_slot(), _side_cave()]
+    game = TetrisGame(seed=seed)
+    bot = SmartBot()
+    while len(boards) < count and not game.game_over:
+        boards.append(game.snapshot())
+        if len(boards) % 3 == 0:
+            game.garbage_queue += 2
+        for action in bot.get_moves(game):
+            game.step(action)
+        while game.in_clear_anim:
+            game.update(game.clear_anim_duration)
+    return boards
+
+
+def _locks(rows, p_type):
+    return {(placement.footprint, placement.tspin) for placement in MoveGenerator().generate(rows, p_type)}
+
+
+def test_open_air_shortcut_finds_every_lock(monkeypatch):
+    snaps = _boards()
+    games = [TetrisGame.from_snapshot(snap) for snap in snaps]
+    fast = [[_locks(game.rows, p_type) for p_type in PIECE_TYPES] for game in games]
+    monkeypatch.setattr(movegen, 'KICK_ROWS', TOTAL_HEIGHT) # Soft drop one row at a time everywhere
+    slow = [[_locks(game.rows, p_type) for p_type in PIECE_TYPES] for game in games]
+    assert fast == slow
+
+
+def _outcome(game):
+    """Snapshot without last_move_rotate, which step() leaves over from the previous piece."""
+    snap = game.snapshot()
+    state = list(snap.state)
+    del state[SNAPSHOT_FIELDS.index('last_move_rotate')]
+    return snap._replace(state=tuple(state))
+
+
+def test_tspin_double_is_found():
+    game = TetrisGame.from_snapshot(_tspin_slot())
+    assert game.piece_type == MINO_T
+    assert any(placement.tspin and placement.y == TOTAL_HEIGHT - 3 for placement in MoveGenerator().placements(game))
+
+
+def test_side_cave_is_reached():
+    game = TetrisGame.from_snapshot(_side_cave())
+    cave = range(TOTAL_HEIGHT - 4, TOTAL_HEIGHT - 2)
+    assert any(all(row in cave and mask & 0b1111111 for row, mask in placement.footprint)
+               for placement in MoveGenerator().placements(game))
+
+
+def test_paths_replay_to_their_placement():
+    for snap in _boards():
+        rows = TetrisGame.from_snapshot(snap).rows
+        for placement in MoveGenerator().placements(TetrisGame.from_snapshot(snap)):
+            stepped = TetrisGame.from_snapshot(snap)
+            for action in placement.path:
+                stepped.step(action)
+            placed = TetrisGame.from_snapshot(snap)
+            assert placement.apply(placed)
+            assert _outcome(stepped) == _outcome(placed), placement
+            if not stepped.in_clear_anim:
+                expected = rows[:]
+                for row, mask in placement.footprint:
+                    expected[row] |= mask
+                assert stepped.rows == expected, placement
@@ -0,0 +1,51 @@
+# The tables compiled at import must describe exactly the pieces of srs_data:
+# collisions through PLACED_ROWS must match a cell-by-cell test on SHAPES.
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from srs_data import SHAPES, SRS_I, SRS_JLSTZ, MINO_I, MINO_O
+from piece_tables import PIECE_TYPES, PLACED_ROWS, MIN_X, MAX_X, get_kicks
+from tetris_core import TetrisGame, GRID_WIDTH, TOTAL_HEIGHT
+
+
+def _collides(rows, x, y, rot, p_type):
+    for lx, ly in SHAPES[p_type][rot]:
+        bx, by = x + lx, y + ly
+        if bx < 0 or bx >= GRID_WIDTH or by >= TOTAL_HEIGHT:
+            return True
+        if by >= 0 and (rows[by] >> bx) & 1:
+            return True
+    return False
+
+
+def test_placed_rows_cover_the_shape_cells():
+    for p_type in PIECE_TYPES:
+        for rot in range(4):
+            assert set(PLACED_ROWS[p_type][rot]) == set(range(MIN_X[p_type][rot], MAX_X[p_type][rot] + 1))
+            for x, placed in PLACED_ROWS[p_type][rot].items():
+                cells = {(bx, ly) for ly, mask in placed for bx in range(GRID_WIDTH) if mask >> bx & 1}
+                assert cells == {(x + lx, ly) for lx, ly in SHAPES[p_type][rot]}
+
+
+def test_collisions_match_shapes():
+    rng = random.Random(4)
+    game = TetrisGame(seed=4)
+    for _ in range(20):
+        game.rows = [rng.getrandbits(GRID_WIDTH) if y > 30 and rng.random() < 0.7 else 0 for y in range(TOTAL_HEIGHT)]
+        for p_type in PIECE_TYPES:
+            for rot in range(4):
+                for x in range(-3, GRID_WIDTH + 1):
+                    for y in range(-2, TOTAL_HEIGHT):
+                        assert game._check_collision(x, y, rot, p_type) == _collides(game.rows, x, y, rot, p_type)
+
+
+def test_kicks_match_srs():
+    for p_type in PIECE_TYPES:
+        table = SRS_I if p_type == MINO_I else SRS_JLSTZ
+        for rot in range(4):
+            for direction in (1, -1):
+                expected = () if p_type == MINO_O else tuple(table[(rot, (rot + direction) % 4)])
+                assert get_kicks(p_type, rot, direction) == expected
@@ -0,0 +1,27 @@
+# TetrisGame.place() must leave the game unchanged when it returns False.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tetris_core import TetrisGame, GRID_WIDTH
+from zobrist import hash_rows
+
+
+def test_failed_hold_placement_with_pending_garbage_changes_nothing():
+    game = TetrisGame(seed=4)
+    game.garbage_queue = 3 # The spawn after the hold adds these first
+    assert game.hold_piece is None
+    before = game.snapshot()
+    assert not game.place(GRID_WIDTH + 5, 0, use_hold=True)
+    assert game.snapshot() == before
+    assert hash_rows(game.rows) == game.board_hash
+
+
+def test_hold_placement_with_pending_garbage_locks():
+    game = TetrisGame(seed=4)
+    game.garbage_queue = 3
+    held = game.piece_type
+    assert game.place(4, 0, use_hold=True)
+    assert game.hold_piece == held and game.garbage_queue == 0
+    assert hash_rows(game.rows) == game.board_hash
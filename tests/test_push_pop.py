@@ -0,0 +1,66 @@
+# push_placement()/pop() must take a game back exactly, at any depth, and a
+# pushed placement must lock like place() with the clear resolved at once.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from srs_data import ROT_0
+from tetris_core import TetrisGame, SPAWN_X
+from movegen import MoveGenerator
+
+
+def _state(game):
+    """Snapshot plus the incremental board statistics snapshot() does not carry."""
+    return (game.snapshot(), game.row_counts[:], game.col_heights[:], game.total_cells, game.total_height)
+
+
+def _search(game, generator, depth, width):
+    """Pushes every width-th placement (with and without hold) down to `depth`, popping each."""
+    if depth == 0:
+        return 0
+    count = 0
+    for use_hold in (False, True):
+        if use_hold and game.hold_used:
+            continue
+        for placement in generator.placements(game, use_hold)[::width]:
+            before = _state(game)
+            if not game.push_placement(SPAWN_X, ROT_0, use_hold, placement.path[:-1]):
+                continue
+            count += 1 + _search(game, generator, depth - 1, width)
+            game.pop()
+            assert _state(game) == before
+    return count
+
+
+def test_nested_push_pop_restores_everything():
+    generator = MoveGenerator()
+    game = TetrisGame(seed=10)
+    for turn in range(10):
+        start = _state(game)
+        assert _search(game, generator, depth=3, width=9) > 0
+        assert game.push_depth == turn and _state(game) == start
+        game.garbage_queue += turn % 3
+        placements = generator.placements(game)
+        assert placements[turn % len(placements)].push(game) # Walk on without popping
+    while game.push_depth:
+        game.pop()
+    assert _state(game) == _state(TetrisGame(seed=10))
+
+
+def test_push_matches_place():
+    generator = MoveGenerator()
+    game = TetrisGame(seed=13)
+    for turn in range(30):
+        placements = generator.placements(game)
+        if not placements:
+            break
+        placement = placements[(turn * 5) % len(placements)]
+        placed = TetrisGame.from_snapshot(game.snapshot())
+        assert placement.apply(placed)
+        while placed.in_clear_anim:
+            placed.update(placed.clear_anim_duration)
+        assert placement.push(game)
+        assert game.rows == placed.rows and game.colors == placed.colors
+        assert (game.score, game.combo, game.back_to_back, game.piece_type, game.bag) == \
+               (placed.score, placed.combo, placed.back_to_back, placed.piece_type, placed.bag)
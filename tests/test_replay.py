@@ -0,0 +1,72 @@
+# ReplayPlayer.seek() must land on the exact game the recorder saw at that
+# frame, whichever keyframe it starts from and in whichever order it seeks.
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from tetris_core import TetrisGame, SNAPSHOT_FIELDS
+from replay import Replay, ReplayRecorder, ReplayPlayer
+from ai_logic import SmartBot
+
+FRAMES = 1500
+KEYFRAME_INTERVAL = 100
+TIMERS = [SNAPSHOT_FIELDS.index(name) for name in ('clear_timer', 'fall_timer')]
+
+
+def _exact(snap):
+    """Snapshot with the ms timers cut out (advance(n) sums them in a different order than n steps of one frame)."""
+    state = list(snap.state)
+    for i in reversed(TIMERS):
+        del state[i]
+    return snap._replace(state=tuple(state))
+
+
+def _same(snap, expected):
+    return _exact(snap) == _exact(expected) and all(snap.state[i] == pytest.approx(expected.state[i]) for i in TIMERS)
+
+
+def _record(seed=5):
+    """A bot-played match with garbage coming in; returns (replay, {frame: snapshot})."""
+    rec = ReplayRecorder(TetrisGame(seed=seed), keyframe_interval=KEYFRAME_INTERVAL)
+    game = rec.game
+    bot = SmartBot()
+    plan = []
+    snaps = {}
+    while rec.frame < FRAMES and not game.game_over:
+        if rec.frame % 240 == 120:
+            rec.add_garbage(2)
+        if not game.in_clear_anim and rec.frame % 2 == 0: # A key every other frame, gravity in between
+            if not plan:
+                plan = bot.get_moves(game)
+            if plan:
+                rec.step(plan.pop(0))
+        snaps[rec.frame] = game.snapshot()
+        rec.advance(1)
+    snaps[rec.frame] = game.snapshot()
+    return rec.replay(), snaps
+
+
+def test_seek_matches_the_recorded_game():
+    replay, snaps = _record()
+    assert replay.frames == FRAMES and len(replay.keyframes) > 10
+    replay = Replay.from_bytes(replay.to_bytes())
+
+    player = ReplayPlayer(replay)
+    frames = list(snaps)
+    random.Random(2).shuffle(frames) # Backwards and forwards, across and within keyframes
+    for frame in frames:
+        assert _same(player.seek(frame).snapshot(), snaps[frame]), frame
+
+
+def test_seek_matches_playing_from_the_start():
+    replay, snaps = _record()
+    from_start = ReplayPlayer(Replay(replay.header, replay.events, replay.keyframes[:1]))
+    player = ReplayPlayer(replay)
+    for frame in range(0, FRAMES + 1, 37):
+        expected = from_start.play_to(frame).snapshot()
+        assert _same(expected, snaps[frame])
+        assert _same(player.seek(frame).snapshot(), expected)
@@ -0,0 +1,68 @@
+# SmartBot.search(time_budget=...) must return within its budget plus about one
+# move generation, and the shipped AIController options must search past one piece.
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tetris_core import TetrisGame
+from ai_logic import SmartBot
+from movegen import MoveGenerator
+from piece_tables import PIECE_TYPES
+from tetris_controller import AI_THINK_MS, AI_BOT_OPTIONS, AI_PONDER_OPTIONS
+
+PIECES = 60
+SLACK_MS = 3 # Timer granularity, scheduling and the scoring after the last deadline check
+ATTEMPTS = 3 # Wall-clock checks: a run that shared the CPU with another process is retried
+
+
+def _play(options, budget, seed=11):
+    """Plays PIECES pieces like AIController. Returns (overruns in ms, depths, boards)."""
+    game = TetrisGame(seed=seed)
+    bot = SmartBot(**options)
+    overruns, depths, boards = [], [], []
+    while len(boards) < PIECES and not game.game_over:
+        boards.append(game.rows[:])
+        started = time.perf_counter()
+        result = bot.search(game, budget)
+        overruns.append(1000 * (time.perf_counter() - started) - budget)
+        depths.append(result.depth)
+        for action in result.moves:
+            game.step(action)
+        while game.in_clear_anim:
+            game.update(game.clear_anim_duration)
+    return overruns, depths, boards
+
+
+def _move_generation_ms(boards):
+    """Slowest uncached move generation of any piece on these boards."""
+    slowest = 0.0
+    for rows in boards:
+        for p_type in PIECE_TYPES:
+            started = time.perf_counter()
+            MoveGenerator().generate(rows, p_type)
+            slowest = max(slowest, 1000 * (time.perf_counter() - started))
+    return slowest
+
+
+def test_search_stays_within_budget():
+    SmartBot().search(TetrisGame(seed=0), 1) # Imports and tables
+    for options in (AI_BOT_OPTIONS, AI_PONDER_OPTIONS):
+        for budget in (1, AI_THINK_MS):
+            for _ in range(ATTEMPTS):
+                overruns, _, boards = _play(options, budget)
+                allowed = _move_generation_ms(boards) + SLACK_MS
+                if sorted(overruns)[-2] <= allowed: # One search may still lose the CPU
+                    break
+            else:
+                raise AssertionError((options, budget, sorted(overruns)[-3:], allowed))
+
+
+def test_shipped_options_search_past_one_piece():
+    for _ in range(ATTEMPTS):
+        _, depths, _ = _play(AI_BOT_OPTIONS, AI_THINK_MS)
+        if sum(depth >= 2 for depth in depths) >= len(depths) // 2:
+            break
+    else:
+        raise AssertionError(depths)
@@ -0,0 +1,76 @@
+# VecTetris must follow TetrisGame's rules: the same keys from the same
+# position lead to the same board, piece, hold and score.
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip('numpy')
+
+from tetris_core import (TetrisGame, ACTION_LEFT, ACTION_RIGHT, ACTION_DOWN, ACTION_DROP,
+                         ACTION_ROTATE_R, ACTION_ROTATE_L, ACTION_HOLD)
+from vec_tetris import VecTetris
+from ai_logic import SmartBot
+
+KEYS = [ACTION_LEFT, ACTION_RIGHT, ACTION_DOWN, ACTION_ROTATE_R, ACTION_ROTATE_L, ACTION_HOLD]
+
+
+def _deal(env, i, game):
+    """Gives game i of `env` the bag of `game` (the two draw their pieces from different RNGs)."""
+    env.bag[i] = 0
+    env.bag[i, :len(game.bag)] = game.bag
+    env.bag_len[i] = len(game.bag)
+
+
+def _state(game):
+    return (list(game.rows), game.piece_type, game.piece_x, game.piece_y, game.piece_rot,
+            game.hold_piece or 0, game.hold_used, game.score, game.combo, game.back_to_back, game.game_over)
+
+
+def _vec_state(env, i):
+    return (env.boards[i].tolist(), int(env.piece_type[i]), int(env.piece_x[i]), int(env.piece_y[i]),
+            int(env.piece_rot[i]), int(env.hold_piece[i]), bool(env.hold_used[i]), int(env.score[i]),
+            int(env.combo[i]), bool(env.back_to_back[i]), bool(env.game_over[i]))
+
+
+def _play(games, env, next_keys, steps):
+    """Steps `games` and `env` with the same keys; returns the line clears seen."""
+    for i, game in enumerate(games):
+        env.piece_type[i] = game.piece_type
+        _deal(env, i, game)
+    assert [_vec_state(env, i) for i in range(len(games))] == [_state(game) for game in games]
+    lines = 0
+    for _ in range(steps):
+        actions = [next_keys(i, game) for i, game in enumerate(games)]
+        for game, action in zip(games, actions):
+            game.step(action)
+            while game.in_clear_anim:
+                game.update(game.clear_anim_duration)
+        env.step(np.array(actions))
+        lines += int(env.last_lines.sum())
+        for i, game in enumerate(games):
+            _deal(env, i, game)
+            assert _vec_state(env, i) == _state(game)
+    return lines
+
+
+def test_bot_and_random_keys_match_tetris_game():
+    games = [TetrisGame(seed=7), TetrisGame(seed=8)]
+    bot = SmartBot()
+    rng = random.Random(1)
+    plan = []
+
+    def next_keys(i, game):
+        if i == 1: # Random keys, a drop every eighth key on average
+            return ACTION_DROP if rng.random() < 1 / 8 else rng.choice(KEYS)
+        if game.game_over:
+            return ACTION_DOWN
+        if not plan:
+            plan.extend(bot.get_moves(game))
+        return plan.pop(0)
+
+    lines = _play(games, VecTetris(2, seed=0), next_keys, 1500)
+    assert lines >= 10 # The bot game clears lines, so combos and attack scoring are covered
@@ -0,0 +1,71 @@
+# The incrementally updated Zobrist hashes must always equal a hash recomputed
+# from the board: TetrisGame.board_hash through locks, clears, garbage and
+# undo, and SmartBot's child hashes in the search.
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tetris_core import TetrisGame
+from zobrist import ROW_KEYS, hash_rows
+from movegen import MoveGenerator
+from ai_logic import SmartBot
+
+
+def _play(seed, pieces):
+    """Yields a bot-played game after every piece, with garbage coming in."""
+    game = TetrisGame(seed=seed)
+    bot = SmartBot()
+    for piece in range(pieces):
+        if game.game_over:
+            return
+        if piece % 4 == 3:
+            game.garbage_queue += 2
+        for action in bot.get_moves(game):
+            game.step(action)
+            yield game
+        while game.in_clear_anim:
+            game.update(game.clear_anim_duration)
+            yield game
+
+
+def test_game_hash_matches_board():
+    for game in _play(seed=6, pieces=120):
+        assert game.board_hash == hash_rows(game.rows)
+
+
+def test_push_pop_hash_matches_board():
+    game = TetrisGame(seed=8)
+    generator = MoveGenerator()
+    for _ in range(40):
+        placements = generator.placements(game)
+        if not placements:
+            break
+        hashes = [game.board_hash]
+        for placement in placements[::5]:
+            assert placement.push(game)
+            assert game.board_hash == hash_rows(game.rows)
+            game.pop()
+            assert game.board_hash == hashes[0] == hash_rows(game.rows)
+        assert placements[len(placements) // 2].push(game) # Keep one and go on from there
+        game.garbage_queue += 1
+
+
+def test_search_child_hash_matches_board():
+    bot = SmartBot()
+    for game in _play(seed=9, pieces=30):
+        if game.in_clear_anim:
+            continue
+        rows = tuple(game.rows)
+        for placement in bot.movegen.placements(game):
+            new_rows, cleared = bot._apply_placement(rows, placement)
+            assert bot._child_hash(rows, game.board_hash, placement, new_rows, cleared) == hash_rows(new_rows)
+
+
+def test_keys_do_not_depend_on_lookup_order():
+    script = "from zobrist import ROW_KEYS; print(ROW_KEYS[{}][{}])"
+    for y, mask in ((39, 1), (0, 1023), (21, 512)):
+        assert ROW_KEYS[y][mask] == int(subprocess.check_output(
+            [sys.executable, '-c', script.format(y, mask)], cwd=ROOT))
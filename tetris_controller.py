@@ -1,16 +1,20 @@
-import pygame
 import random
-from ai_logic import RandomBot, SmartBot # Import both
-
-# Actions (Mirrored from tetris.py to avoid circular import)
-ACTION_NONE = 0
-ACTION_LEFT = 1
-ACTION_RIGHT = 2
-ACTION_DOWN = 3 # Soft drop
-ACTION_DROP = 4 # Hard drop
-ACTION_ROTATE_R = 5
-ACTION_ROTATE_L = 6
-ACTION_HOLD = 7
+from tetris_core import (ACTION_NONE, ACTION_LEFT, ACTION_RIGHT, ACTION_DOWN, ACTION_DROP,
+                         ACTION_ROTATE_R, ACTION_ROTATE_L, ACTION_HOLD, FRAME_MS, TetrisGame)
+from ai_logic import RandomBot, SmartBot, PREVIEW_SIZE # Import both
+# Thinking time per AI decision (ms). The bot plans inside one frame of the
+# 60 FPS loop, so this caps that frame's stall; SmartBot searches as deep as it allows.
+AI_THINK_MS = 12
+# Upper bound of a background (pondering) search; it also gets at most the time
+# the current plan takes to play out, so the next plan is normally ready on spawn.
+AI_PONDER_MS = 200
+# Narrow enough that all three pieces fit in AI_THINK_MS; the ponder worker
+# has far more time, so it searches wider and deeper.
+AI_BOT_OPTIONS = {'beam_width': 1, 'depth': 3, 'use_hold': True}
+AI_PONDER_OPTIONS = {'beam_width': 6, 'depth': 4, 'use_hold': True}
+
+# Note: pygame is imported lazily inside HumanController, so AI-only and
+# headless users of this module never initialize SDL.
 
 class TetrisController:
     """
@@ -34,6 +38,10 @@ class TetrisController:
         """
         pass
 
+    def close(self):
+        """Releases background resources (AI worker processes)."""
+        pass
+
 class HumanController(TetrisController):
     """
     Controls the game via Keyboard input.
@@ -73,6 +81,8 @@ class HumanController(TetrisController):
         self.sdi_ms = sdi
 
     def handle_event(self, event):
+        import pygame # Lazy: only human input needs pygame
+
         if self.game.game_over:
             # Special case: Restart
             if event.type == pygame.KEYDOWN and event.key == self.key_map.get('RESTART', pygame.K_r):
@@ -139,34 +149,139 @@ class HumanController(TetrisController):
                             elif action_name == 'RIGHT': self.game.step(ACTION_RIGHT)
                             elif action_name == 'DOWN': self.game.step(ACTION_DOWN)
 
+# --- Pondering (runs in the AIController's worker process) ---
+
+_ponder_bot = None
+
+def _init_ponder(bot_options):
+    global _ponder_bot
+    _ponder_bot = SmartBot(**bot_options)
+
+def _warm_up():
+    return True
+
+def position_key(game):
+    """Everything a plan for the current piece depends on: two positions with the same key get the same plan."""
+    return (game.board_hash, game.piece_type, game.piece_x, game.piece_y, game.piece_rot,
+            game.hold_piece, game.hold_used, tuple(game.bag[:PREVIEW_SIZE]))
+
+def _ponder(snapshot, moves, time_budget):
+    """
+    Plays `moves` on the snapshot's game and searches the position the next piece
+    spawns in. Returns (position_key, SearchResult), or None if the plan ends the game.
+    """
+    game = TetrisGame.from_snapshot(snapshot)
+    for action in moves:
+        game.step(action)
+    while game.in_clear_anim:
+        game.update(game.clear_anim_duration)
+    if game.game_over:
+        return None
+    return position_key(game), _ponder_bot.search(game, time_budget)
+
+
 class AIController(TetrisController):
     """
     Controls the game via AI Logic.
+    With ponder=True the plan for the next piece is searched in a worker process
+    while the current plan's keypresses play out. It is used only if the game
+    reaches exactly the predicted position (e.g. no garbage came in meanwhile);
+    otherwise the controller re-plans on the spot.
+    With search_workers=N each ply of the bot's searches is split across
+    N processes (parallel_search.ParallelSmartBot), started and warmed up here.
+    weights: SmartBot heuristic weights (dict or JSON config from tuning.py).
+    Call close() to stop the worker processes.
     """
-    def __init__(self, game):
+    def __init__(self, game, think_ms=AI_THINK_MS, ponder=False, search_workers=0, weights=None):
         super().__init__(game)
         self.move_queue = [] # List of actions to execute
         self.timer = 0
         self.action_delay = 50 # Make it faster! (Original 150)
-        self.bot = SmartBot() # Use SmartBot!
+        # Anytime beam search over the NEXT queue + hold
+        if search_workers:
+            from parallel_search import ParallelSmartBot
+            self.bot = ParallelSmartBot(workers=search_workers, time_budget=think_ms, weights=weights, **AI_BOT_OPTIONS)
+        else:
+            self.bot = SmartBot(time_budget=think_ms, weights=weights, **AI_BOT_OPTIONS)
+        self.last_search = None # SearchResult of the last plan (depth reached, nodes)
+
+        self.executor = None
+        self.pondering = None # Future of the _ponder() for the next piece
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+        if ponder:
+            import multiprocessing as mp
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn: never fork a process that has SDL initialized
+            self.executor = ProcessPoolExecutor(1, mp_context=mp.get_context('spawn'),
+                                                initializer=_init_ponder,
+                                                initargs=(dict(AI_PONDER_OPTIONS, weights=self.bot.get_weights()),))
+            self.executor.submit(_warm_up) # Start the worker now, not on the first piece
 
     def update_speed(self, delay_ms):
         """Update the delay between AI actions."""
         self.action_delay = delay_ms
 
+    def update_think_budget(self, think_ms):
+        """Update the bot's thinking time per decision (ms)."""
+        if isinstance(self.bot, SmartBot):
+            self.bot.time_budget = max(1, think_ms)
+
+    def _plan(self):
+        """Moves for the current piece, or None while a pondered plan is still being searched."""
+        if not isinstance(self.bot, SmartBot):
+            return self.bot.get_moves(self.game)
+        result = None
+        if self.pondering is not None:
+            if not self.pondering.done():
+                return None
+            future, self.pondering = self.pondering, None
+            try:
+                pondered = future.result()
+            except Exception:
+                pondered = None # Worker failed: search here instead
+            if pondered is not None and pondered[0] == position_key(self.game):
+                result = pondered[1]
+                self.ponder_hits += 1
+            else:
+                self.ponder_misses += 1 # The game went elsewhere (garbage, gravity): re-plan
+        if result is None:
+            result = self.bot.search(self.game)
+        self.last_search = result
+
+        if self.executor is not None and result.moves:
+            # Search the next piece while these moves play out
+            budget = max(self.bot.time_budget or 0,
+                         min(AI_PONDER_MS, len(result.moves) * max(self.action_delay, FRAME_MS)))
+            self.pondering = self.executor.submit(_ponder, self.game.snapshot(), result.moves, budget)
+        return list(result.moves)
+
     def update(self, dt):
         if self.game.game_over:
             return
+        if self.game.in_clear_anim:
+            # No piece to control yet (step() ignores input); plan once the next one spawns
+            return
 
         self.timer += dt
         if self.timer >= self.action_delay:
-            self.timer = 0
-            
             # If no moves left, ask the bot for a plan!
             if not self.move_queue:
-                self.move_queue = self.bot.get_moves(self.game)
+                plan = self._plan()
+                if plan is None:
+                    return # Pondered plan arrives within a frame or two
+                self.move_queue = plan
+            self.timer = 0
 
             # Execute next move
             if self.move_queue:
                 action = self.move_queue.pop(0)
                 self.game.step(action)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+            self.pondering = None
+        if hasattr(self.bot, 'close'):
+            self.bot.close()
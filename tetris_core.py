@@ -0,0 +1,857 @@
+# Moca-Tris Core (Game Rules)
+# Headless game logic: no pygame import here, so simulations and worker
+# processes can use TetrisGame without paying for SDL initialization.
+import math
+from array import array
+from collections import namedtuple
+from collections.abc import Sequence
+from operator import attrgetter
+from srs_data import *
+from piece_tables import CELLS, ROW_MASKS, PLACED_ROWS, get_kicks
+from zobrist import ROW_KEYS, hash_rows, state_hash
+from sequences import PieceSequence, GarbageSequence, new_seed
+
+# --- CONFIG ---
+GRID_WIDTH = 10
+GRID_HEIGHT = 20 # Visible height. Usually there is buffer.
+BUFFER_HEIGHT = 20 # Extra height for spawning
+TOTAL_HEIGHT = GRID_HEIGHT + BUFFER_HEIGHT
+FULL_ROW = (1 << GRID_WIDTH) - 1 # Bitmask of a completely filled row
+FRAME_MS = 1000 / 60 # One frame at 60 FPS (unit of TetrisGame.advance)
+TIMER_EPSILON = 1e-6 # ms; a timer this close to its limit has fired (absorbs float sums of FRAME_MS)
+SPAWN_X = 3 # Standard spawn x
+SPAWN_Y = 18 # Spawn just above visible area (index 20 starts visible)
+
+# Actions
+ACTION_NONE = 0
+ACTION_LEFT = 1
+ACTION_RIGHT = 2
+ACTION_DOWN = 3 # Soft drop
+ACTION_DROP = 4 # Hard drop
+ACTION_ROTATE_R = 5
+ACTION_ROTATE_L = 6
+ACTION_HOLD = 7
+
+# Scalar attributes captured by TetrisGame.snapshot() (everything but the board, bag and clearing lines)
+SNAPSHOT_FIELDS = ('piece_type', 'piece_x', 'piece_y', 'piece_rot', 'hold_piece', 'hold_used',
+                   'score', 'combo', 'back_to_back', 'game_over', 'garbage_queue', 'last_attack', 'ren_chain',
+                   'in_clear_anim', 'clear_timer', 'clear_anim_duration', 'fall_speed', 'fall_timer',
+                   'is_perfect_clear', 'last_move_rotate', 'is_tspin', 'show_b2b', 'last_clear_y',
+                   'current_piece', 'board_hash', 'seed', 'pieces_dealt', 'garbage_dealt')
+_get_snapshot_fields = attrgetter(*SNAPSHOT_FIELDS)
+
+# Immutable, picklable copy of a TetrisGame (see TetrisGame.snapshot):
+# rows    -- bitboard packed as array('H') bytes (2 bytes per row)
+# colors  -- color plane packed as bytes (1 byte per cell)
+# bag, clearing_lines -- tuples
+# state   -- tuple of the SNAPSHOT_FIELDS values
+# sequence_seeds -- seeds of the game's PieceSequence and GarbageSequence
+GameSnapshot = namedtuple('GameSnapshot', ('rows', 'colors', 'bag', 'clearing_lines', 'state', 'sequence_seeds'))
+
+class _GridView(Sequence):
+    """Live read-only view of a game's color plane: view[y] is row y as a tuple (built on access)."""
+    __slots__ = ('_game',)
+
+    def __init__(self, game):
+        self._game = game
+
+    def __len__(self):
+        return TOTAL_HEIGHT
+
+    def __getitem__(self, y):
+        if isinstance(y, slice):
+            return tuple(tuple(row) for row in self._game.colors[y])
+        return tuple(self._game.colors[y])
+
+class TetrisGame:
+    """
+    One player's game. Pieces and garbage holes come from seeded streams:
+      seed     -- reproduces the game (default: a fresh random seed, kept in self.seed)
+      pieces   -- sequences.PieceSequence to deal from (share one between games
+                  to give them the same pieces; default: PieceSequence(seed))
+      garbage  -- sequences.GarbageSequence for garbage holes (default: GarbageSequence(seed))
+    """
+    def __init__(self, seed=None, pieces=None, garbage=None):
+        # Board (Bitboard)
+        # Each row is a GRID_WIDTH-bit occupancy mask (bit x = column x).
+        # All rules (collision, clears, garbage) only look at these masks.
+        # The color plane mirrors them and is only kept for rendering.
+        self.rows = [0] * TOTAL_HEIGHT
+        self.colors = [[0 for _ in range(GRID_WIDTH)] for _ in range(TOTAL_HEIGHT)]
+
+        # Board Statistics (kept up to date incrementally)
+        self.row_counts = [0] * TOTAL_HEIGHT  # Filled cells per row
+        self.col_heights = [0] * GRID_WIDTH   # TOTAL_HEIGHT - topmost filled row (0 = empty column)
+        self.total_cells = 0                  # Filled cells on the whole board
+        self.total_height = 0                 # sum(col_heights)
+        self.board_hash = 0                   # Zobrist hash of `rows` (zobrist.hash_rows)
+
+        # Randomness (deterministic streams, see sequences.py)
+        self.seed = new_seed() if seed is None else seed
+        self.pieces = pieces if pieces is not None else PieceSequence(self.seed)
+        self.garbage = garbage if garbage is not None else GarbageSequence(self.seed)
+        self.pieces_dealt = 0   # Pieces moved from `pieces` into the bag
+        self.garbage_dealt = 0  # Garbage rows received from `garbage`
+
+        self.bag = []
+        self.current_piece = None
+        self.hold_piece = None
+        self.hold_used = False
+        self.score = 0
+        self.game_over = False
+        self.combo = -1
+        self.back_to_back = False
+        
+        # Current Piece State
+        self.piece_x = 0
+        self.piece_y = 0
+        self.piece_rot = 0
+        self.piece_type = 0
+        
+        # Animation State
+        self.clearing_lines = []   
+        self.clear_timer = 0       
+        self.clear_anim_duration = 500 # ms
+        
+        # Gravity State
+        self.fall_speed = 800 # ms per row
+        self.fall_timer = 0   # ms since the last gravity step
+        self.in_clear_anim = False
+        self.is_perfect_clear = False # New state for Perfect Clear
+        self.last_move_rotate = False # For T-Spin detection
+        self.is_tspin = 0 # 0=None, 1=Mini, 2=Normal
+        self.show_b2b = False # Display flag for Back-to-Back
+        
+        # Attack System
+        self.garbage_queue = 0  # Pending garbage lines to receive (count)
+        self.last_attack = 0    # Last attack sent (for display)
+        self.ren_chain = 0      # Current REN (Combo) count
+        self.last_clear_y = 10  # Y-coordinate of last clear (for effects)
+        
+        # Make/Unmake (push_placement / pop)
+        self._undo_stack = []   # One undo entry per pushed placement
+        self._journal = None    # Board edits of the placement being pushed (None = not recording)
+
+        self._fill_bag()
+        self._spawn_piece()
+
+    @property
+    def grid(self):
+        """Read-only 40x10 view of the board (0=empty, 1-7=piece colors, 8=garbage).
+        It follows the game; grid[y] is a tuple copy of row y, so take a row once per use."""
+        return _GridView(self)
+
+    # --- Board Statistics (O(1)) ---
+    @property
+    def column_heights(self):
+        """Per-column stack heights (read-only list, 0 = empty column)."""
+        return self.col_heights
+
+    @property
+    def row_fill_counts(self):
+        """Filled cells per row (read-only list, index = row)."""
+        return self.row_counts
+
+    @property
+    def cell_count(self):
+        """Total filled cells on the board."""
+        return self.total_cells
+
+    @property
+    def aggregate_height(self):
+        """Sum of all column heights."""
+        return self.total_height
+
+    @property
+    def hole_count(self):
+        """Empty cells below the top of their column.
+        Every column of height h holds h cells, filled or holes, so this is a single subtraction."""
+        return self.total_height - self.total_cells
+
+    @property
+    def zobrist_hash(self):
+        """Zobrist hash of the board, the current piece and the hold slot (transposition key)."""
+        return state_hash(self.board_hash, self.piece_type, self.hold_piece)
+
+    def _rebuild_stats(self):
+        """Recomputes the board statistics from the bitboard (after clears, garbage or external edits)."""
+        rows = self.rows
+        self.row_counts = [bin(r).count('1') for r in rows]
+        self.total_cells = sum(self.row_counts)
+        heights = [0] * GRID_WIDTH
+        seen = 0
+        for y in range(TOTAL_HEIGHT):
+            new = rows[y] & ~seen
+            if new:
+                for x in range(GRID_WIDTH):
+                    if (new >> x) & 1:
+                        heights[x] = TOTAL_HEIGHT - y
+                seen |= new
+                if seen == FULL_ROW:
+                    break
+        self.col_heights = heights
+        self.total_height = sum(heights)
+
+    def _fill_bag(self):
+        # Next 7-bag of the piece sequence
+        self.bag.extend(self.pieces.take(self.pieces_dealt, 7))
+        self.pieces_dealt += 7
+
+    def _spawn_piece(self):
+        # Process pending garbage before spawning
+        self._process_garbage()
+        
+        bag_len = len(self.bag)
+        if bag_len < 7:
+            self._fill_bag()
+        
+        self.piece_type = self.bag.pop(0)
+        if self._journal is not None:
+            self._journal.append(('spawn', bag_len, self.piece_type))
+        self.piece_rot = ROT_0
+        self.piece_x = SPAWN_X
+        self.piece_y = SPAWN_Y
+        
+        # Check collision immediately (Game Over condition)
+        if self._check_collision(self.piece_x, self.piece_y, self.piece_rot, self.piece_type):
+            self.game_over = True
+
+        self.hold_used = False
+        self.fall_timer = 0 # Gravity restarts for every new piece
+
+    def update(self, dt):
+        """Update game state by dt ms (clear animation, then gravity).
+        Returns True if animation finished this frame."""
+        if self.in_clear_anim:
+            self.clear_timer += dt
+            if self.clear_timer >= self.clear_anim_duration - TIMER_EPSILON:
+                self._finish_clear_anim()
+                return True
+            return False
+        
+        if self.game_over:
+            return False
+        
+        # Gravity: one row per fall_speed ms, lock when resting on the stack
+        self.fall_timer += dt
+        if self.fall_timer >= self.fall_speed - TIMER_EPSILON:
+            self.fall_timer = 0
+            self._gravity_step()
+        return False
+
+    def advance(self, frames, dt=FRAME_MS):
+        """
+        Jumps `frames` frames of dt ms forward in closed form.
+        Same result as calling update(dt) `frames` times, but falling is
+        resolved by the ghost row at once instead of one gravity step at a time.
+        Returns the number of frames left unused (non-zero only on game over).
+        """
+        while frames > 0 and not self.game_over:
+            if self.in_clear_anim:
+                needed = self._frames_until(self.clear_anim_duration - self.clear_timer, dt)
+                if frames < needed:
+                    self.clear_timer += frames * dt
+                    return 0
+                frames -= needed
+                self.clear_timer += needed * dt
+                self._finish_clear_anim()
+                continue
+            
+            first = self._frames_until(self.fall_speed - self.fall_timer, dt)
+            if frames < first:
+                self.fall_timer += frames * dt
+                return 0
+            per_step = self._frames_until(self.fall_speed, dt)
+            steps = 1 + (frames - first) // per_step
+            distance = self.get_ghost_y() - self.piece_y
+            if steps <= distance:
+                # Still falling when time runs out
+                self.piece_y += steps
+                self.fall_timer = ((frames - first) % per_step) * dt
+                return 0
+            
+            # Lands, then locks on the next gravity step
+            self.piece_y += distance
+            frames -= first + distance * per_step
+            self.fall_timer = 0
+            self._lock_piece()
+        return frames
+
+    def _frames_until(self, ms, dt):
+        """Frames of dt ms until a timer that is `ms` short of its limit fires (at least 1)."""
+        return max(1, math.ceil((ms - TIMER_EPSILON) / dt))
+
+    def _gravity_step(self):
+        if not self._check_collision(self.piece_x, self.piece_y + 1, self.piece_rot, self.piece_type):
+            self.piece_y += 1
+        else:
+            self._lock_piece()
+
+    def _finish_clear_anim(self):
+        self._finalize_clear()
+        self.in_clear_anim = False
+        self._spawn_piece()
+        self.hold_used = False # Reset hold on new spawn
+
+    def _finalize_clear(self):
+        # Actually remove lines from the board (masks and color plane together)
+        cleared = set(self.clearing_lines)
+        keep = [i for i in range(TOTAL_HEIGHT) if i not in cleared]
+        if self._journal is not None:
+            lines = sorted(cleared)
+            self._journal.append(('clear', lines, [self.colors[y] for y in lines]))
+        # Only the rows above the lowest cleared line move: rehash just those
+        moved = max(cleared, default=-1) + 1
+        h = self.board_hash
+        for y in range(moved):
+            if self.rows[y]:
+                h ^= ROW_KEYS[y][self.rows[y]]
+        # Add empty lines at top
+        self.rows = [0] * len(cleared) + [self.rows[i] for i in keep]
+        for y in range(moved):
+            if self.rows[y]:
+                h ^= ROW_KEYS[y][self.rows[y]]
+        self.board_hash = h
+        self.colors = [[0 for _ in range(GRID_WIDTH)] for _ in cleared] + [self.colors[i] for i in keep]
+        self.clearing_lines = []
+        self._rebuild_stats()
+
+    def _get_blocks(self, x, y, rot, p_type):
+        """Returns the absolute coordinates of the 4 blocks of a piece."""
+        return [(x + lx, y + ly) for lx, ly in CELLS[p_type][rot]]
+
+    def _check_collision(self, x, y, rot, p_type):
+        placed = PLACED_ROWS[p_type][rot].get(x)
+        if placed is None:
+            return True # Outside the walls
+        rows = self.rows
+        for ly, mask in placed:
+            by = y + ly
+            if by >= TOTAL_HEIGHT:
+                return True
+            if by >= 0 and rows[by] & mask:
+                return True
+        return False
+
+    def _rotate(self, direction):
+        """
+        direction: 1 for CW (Right), -1 for CCW (Left)
+        """
+        if self.piece_type == 0: return
+
+        old_rot = self.piece_rot
+        new_rot = (self.piece_rot + direction) % 4
+        
+        # SRS Wall Kicks
+        if self.piece_type == MINO_O:
+            return 
+        
+        kicked = self._kick_rotation(self.piece_x, self.piece_y, old_rot, self.piece_type, direction)
+        if kicked is None:
+            return False
+        self.piece_x, self.piece_y, self.piece_rot = kicked
+        return True
+
+    def _kick_rotation(self, x, y, rot, p_type, direction):
+        """Tries the SRS kick tests for rotating a piece at (x, y, rot).
+        Returns the resulting (x, y, rot), or None if every test collides. Does not modify the game."""
+        new_rot = (rot + direction) % 4
+        # Precompiled SRS kick tests (piece_tables)
+        for dx, dy in get_kicks(p_type, rot, direction):
+            if not self._check_collision(x + dx, y + dy, new_rot, p_type):
+                return (x + dx, y + dy, new_rot)
+        return None
+
+    def _lock_piece(self):
+        # Check T-Spin before locking
+        self.is_tspin = self._check_tspin()
+        
+        # Zobrist: swap the key of every row the piece lands in
+        rows = self.rows
+        placed = [(self.piece_y + ly, mask) for ly, mask in PLACED_ROWS[self.piece_type][self.piece_rot][self.piece_x]
+                  if 0 <= self.piece_y + ly < TOTAL_HEIGHT]
+        for by, mask in placed:
+            self.board_hash ^= ROW_KEYS[by][rows[by]] ^ ROW_KEYS[by][rows[by] | mask]
+        
+        blocks = self._get_blocks(self.piece_x, self.piece_y, self.piece_rot, self.piece_type)
+        if self._journal is not None:
+            self._journal.append(('lock', placed, blocks))
+        heights = self.col_heights
+        for bx, by in blocks:
+             if 0 <= by < TOTAL_HEIGHT:
+                 self.rows[by] |= 1 << bx
+                 self.colors[by][bx] = self.piece_type
+                 # Statistics
+                 self.row_counts[by] += 1
+                 self.total_cells += 1
+                 h = TOTAL_HEIGHT - by
+                 if h > heights[bx]:
+                     self.total_height += h - heights[bx]
+                     heights[bx] = h
+        
+        self._check_and_start_clear()
+        
+        # Only spawn if NO clear happened.
+        if not self.in_clear_anim:
+             self._spawn_piece()
+             self.hold_used = False
+
+    def _check_and_start_clear(self):
+        # Only the rows the piece landed in can have become full (bottom to top)
+        lines_to_clear = []
+        for ly, _ in reversed(ROW_MASKS[self.piece_type][self.piece_rot]):
+            y = self.piece_y + ly
+            if 0 <= y < TOTAL_HEIGHT and self.row_counts[y] == GRID_WIDTH:
+                lines_to_clear.append(y)
+        
+        # T-Spin Zero? (No lines cleared but T-Spin performed)
+        # We can award points but animation waits for clear...
+        # For simplicity, handle T-Spin Zero immediately here if no lines to clear
+        if not lines_to_clear and self.is_tspin:
+            self.score += 400 * (self.combo + 1) # T-Spin Zero
+            # Maybe show small text effect?
+            self.combo = -1
+        
+        if lines_to_clear:
+            self.clearing_lines = lines_to_clear
+            self.in_clear_anim = True
+            self.clear_timer = 0
+            
+            # Store Y for effects (average of cleared lines)
+            self.last_clear_y = sum(lines_to_clear) / len(lines_to_clear) if lines_to_clear else 10
+            
+            # Check for Perfect Clear (every filled cell is in a cleared line)
+            self.is_perfect_clear = self.total_cells == len(lines_to_clear) * GRID_WIDTH
+            
+            # Update Score
+            count = len(lines_to_clear)
+            self.combo += 1
+            
+            # Determine if this is a "difficult" clear (Tetris or T-Spin)
+            is_difficult = (count == 4) or self.is_tspin
+            
+            # --- Attack Power Calculation ---
+            attacks = 0
+            
+            # 1. Base Attacks (Lines & T-Spins)
+            if self.is_tspin:
+                if self.is_tspin == 1: # T-Spin Mini
+                     if count == 1: attacks += 0 # TSM
+                     elif count == 2: attacks += 1 # TSM Double (Rare but possible)
+                else: # Normal T-Spin
+                     if count == 1: attacks += 2 # TSS
+                     elif count == 2: attacks += 4 # TSD
+                     elif count == 3: attacks += 6 # TST
+            else:
+                if count == 2: attacks += 1
+                elif count == 3: attacks += 2
+                elif count == 4: attacks += 4 # Tetris
+            
+            # 2. Back-to-Back Bonus
+            b2b_active = False
+            if is_difficult and self.back_to_back:
+                attacks += 1
+                b2b_active = True
+            
+            # 3. Perfect Clear Bonus
+            if self.is_perfect_clear:
+                attacks += 10
+            
+            # 4. REN (Combo) Bonus
+            # Ren table: 0,1->0, 2,3->1, 4,5->2, 6,7->3, 8,9,10->4, 11+->5
+            ren = max(0, self.combo) # combo starts at -1, first clear is 0 (no ren)
+            ren_bonus = 0
+            if ren >= 1: # 1REN = 2nd consecutive clear
+                 if ren < 2: ren_bonus = 0
+                 elif ren < 4: ren_bonus = 1
+                 elif ren < 6: ren_bonus = 2
+                 elif ren < 8: ren_bonus = 3
+                 elif ren < 11: ren_bonus = 4
+                 else: ren_bonus = 5
+            attacks += ren_bonus
+            
+            self.last_attack = attacks
+            
+            # --- Scoring (Simplified based on Attack) ---
+            # Just use attack power for score multiplier to keep it simple, or keep old logic
+            # Keeping the old logic for Score, but added Attack logic above
+            
+            # Base Scores
+            if self.is_tspin:
+                tspin_scores = {1: 800, 2: 1200, 3: 1600}
+                base = tspin_scores.get(count, 0)
+            else:
+                base_scores = {1: 100, 2: 300, 3: 500, 4: 800} 
+                base = base_scores.get(count, 0)
+            
+            score_add = base * (self.combo + 1)
+            if b2b_active: score_add = int(score_add * 1.5)
+            if self.is_perfect_clear: score_add += 3000
+            
+            self.score += score_add
+            
+            # Update Back-to-Back state for NEXT clear
+            if is_difficult:
+                self.back_to_back = True
+            else:
+                self.back_to_back = False
+            
+            # Store B2B display flag (for rendering)
+            self.show_b2b = b2b_active
+        else:
+            if not self.is_tspin: # Combo breaks unless T-Spin Zero (some rules preserve combo on spin)
+                self.combo = -1
+
+    def _hard_drop(self):
+        while not self._check_collision(self.piece_x, self.piece_y + 1, self.piece_rot, self.piece_type):
+            self.piece_y += 1
+        self._lock_piece()
+
+    def _hold(self):
+        if self.hold_used: return
+        
+        if self.hold_piece is None:
+            self.hold_piece = self.piece_type
+            self._spawn_piece()
+        else:
+            self.hold_piece, self.piece_type = self.piece_type, self.hold_piece
+            self.piece_x = SPAWN_X
+            self.piece_y = SPAWN_Y
+            self.piece_rot = ROT_0
+        
+        self.hold_used = True
+
+    def place(self, x, rot, use_hold=False, spin_path=None):
+        """
+        Moves the current piece to column x / rotation rot and locks it, in one call.
+        Same result (score, T-spin, B2B, combo) as pressing [HOLD], the rotations
+        from spawn (R, R R or L), the horizontal shifts, then `spin_path`
+        (ACTION_LEFT/RIGHT/DOWN/ROTATE_R/ROTATE_L, e.g. a tuck or a T-spin) and DROP.
+        The O piece never rotates, so `rot` is ignored for it.
+        Returns True if the piece was locked, False if the target is unreachable
+        (or hold is not available); the game is then left unchanged.
+        """
+        if self.game_over or self.in_clear_anim:
+            return False
+        
+        pending_hold = use_hold
+        if use_hold:
+            if self.hold_used:
+                return False
+            if self.hold_piece is None and self.garbage_queue > 0:
+                # The spawn after holding adds garbage first, so the board the
+                # path must be checked on is only known after the hold: hold
+                # under a journal that can take it back (as push_placement does).
+                if self._journal is None:
+                    return self._place_journaled(x, rot, use_hold, spin_path)
+                self._hold()
+                self.last_move_rotate = False
+                pending_hold = False
+                p_type = self.piece_type
+            else:
+                p_type = self.hold_piece if self.hold_piece is not None else self.bag[0]
+        else:
+            p_type = self.piece_type
+        
+        end = self._simulate_path(p_type, x, rot, spin_path)
+        if end is None:
+            return False
+        
+        if pending_hold:
+            self._hold()
+        self.piece_x, self.piece_y, self.piece_rot, self.last_move_rotate = end
+        self._hard_drop()
+        return True
+
+    def _place_journaled(self, x, rot, use_hold, spin_path):
+        """place() with its board edits journaled, taken back if it returns False."""
+        entry = (self._undo_state(), [])
+        self._journal = entry[1]
+        try:
+            locked = self.place(x, rot, use_hold, spin_path)
+        finally:
+            self._journal = None
+        if not locked:
+            self._unmake(entry)
+        return locked
+
+    # --- Snapshot / Restore ---
+
+    def snapshot(self):
+        """Returns a GameSnapshot of the full game state, including the positions in the piece and garbage streams."""
+        return GameSnapshot(array('H', self.rows).tobytes(),
+                            bytes([c for row in self.colors for c in row]),
+                            tuple(self.bag),
+                            tuple(self.clearing_lines),
+                            _get_snapshot_fields(self),
+                            (self.pieces.seed, self.garbage.seed))
+
+    def restore(self, snap):
+        """Puts the game back in the state of `snap`. Pending push_placement() entries are dropped."""
+        rows = array('H')
+        rows.frombytes(snap.rows)
+        self.rows = rows.tolist()
+        colors = snap.colors
+        self.colors = [list(colors[i:i + GRID_WIDTH]) for i in range(0, TOTAL_HEIGHT * GRID_WIDTH, GRID_WIDTH)]
+        self.bag = list(snap.bag)
+        self.clearing_lines = list(snap.clearing_lines)
+        for name, value in zip(SNAPSHOT_FIELDS, snap.state):
+            setattr(self, name, value)
+        piece_seed, garbage_seed = snap.sequence_seeds
+        if self.pieces is None or self.pieces.seed != piece_seed:
+            self.pieces = PieceSequence(piece_seed)
+        if self.garbage is None or self.garbage.seed != garbage_seed:
+            self.garbage = GarbageSequence(garbage_seed)
+        self._undo_stack = []
+        self._rebuild_stats()
+
+    @classmethod
+    def from_snapshot(cls, snap):
+        """A new game in the state of `snap`."""
+        game = cls.__new__(cls)
+        game._journal = None
+        game.pieces = game.garbage = None
+        game.restore(snap)
+        return game
+
+    # --- Make / Unmake ---
+
+    def push_placement(self, x, rot, use_hold=False, spin_path=None):
+        """
+        place() that can be taken back with pop(), for searching in place without copies.
+        Line clears are resolved at once (no animation), as in VecTetris.
+        The undo entry holds only what changed: the rows the piece landed in,
+        the cleared rows, garbage rows pushed out the top, the pieces taken from
+        the bag and the scalar state (score, combo, B2B, garbage queue, piece, hold).
+        Returns True if the piece was locked; on False the game is unchanged and
+        nothing is pushed.
+        """
+        if self.game_over or self.in_clear_anim:
+            return False
+        state = self._undo_state()
+        journal = self._journal = []
+        try:
+            locked = self.place(x, rot, use_hold, spin_path)
+            if locked and self.in_clear_anim:
+                self._finish_clear_anim()
+        finally:
+            self._journal = None
+        entry = (state, journal)
+        if not locked:
+            self._unmake(entry)
+            return False
+        self._undo_stack.append(entry)
+        return True
+
+    def pop(self):
+        """Takes back the last push_placement(), restoring the game exactly as it was."""
+        self._unmake(self._undo_stack.pop())
+
+    @property
+    def push_depth(self):
+        """Number of placements pushed and not popped yet."""
+        return len(self._undo_stack)
+
+    def _undo_state(self):
+        """The scalar state _unmake() puts back (the board is rebuilt from the journal)."""
+        return (self.score, self.combo, self.back_to_back, self.garbage_queue, self.pieces_dealt, self.garbage_dealt,
+                self.hold_piece, self.hold_used, self.piece_type, self.piece_x, self.piece_y, self.piece_rot,
+                self.last_move_rotate, self.is_tspin, self.is_perfect_clear, self.show_b2b,
+                self.last_attack, self.last_clear_y, self.fall_timer, self.clear_timer, self.game_over,
+                self.board_hash, self.total_cells, self.total_height, self.col_heights[:])
+
+    def _unmake(self, entry):
+        state, journal = entry
+        rows, colors = self.rows, self.colors
+        shifted = False
+        lock_rows = ()
+        for op in reversed(journal):
+            kind = op[0]
+            if kind == 'lock':
+                _, lock_rows, blocks = op
+                for by, mask in lock_rows:
+                    rows[by] &= ~mask
+                for bx, by in blocks:
+                    if 0 <= by < TOTAL_HEIGHT:
+                        colors[by][bx] = 0
+            elif kind == 'clear':
+                # Cleared rows were full; everything above them moved down by len(lines)
+                _, lines, line_colors = op
+                del rows[:len(lines)]
+                del colors[:len(lines)]
+                for y, color_row in zip(lines, line_colors):
+                    rows.insert(y, FULL_ROW)
+                    colors.insert(y, color_row)
+                shifted = True
+            elif kind == 'garbage':
+                # Garbage rows came in at the bottom and pushed the top rows out
+                _, top_rows, top_colors = op
+                count = len(top_rows)
+                del rows[-count:]
+                del colors[-count:]
+                rows[:0] = top_rows
+                colors[:0] = top_colors
+                shifted = True
+            else: # 'spawn': put the piece back at the head of the bag, drop any refill
+                _, bag_len, piece = op
+                self.bag.insert(0, piece)
+                del self.bag[bag_len:]
+        
+        (self.score, self.combo, self.back_to_back, self.garbage_queue, self.pieces_dealt, self.garbage_dealt,
+         self.hold_piece, self.hold_used, self.piece_type, self.piece_x, self.piece_y, self.piece_rot,
+         self.last_move_rotate, self.is_tspin, self.is_perfect_clear, self.show_b2b,
+         self.last_attack, self.last_clear_y, self.fall_timer, self.clear_timer, self.game_over,
+         self.board_hash, self.total_cells, self.total_height, heights) = state
+        self.col_heights = heights
+        self.in_clear_anim = False
+        self.clearing_lines = []
+        if shifted:
+            self._rebuild_stats()
+        else:
+            for by, mask in lock_rows:
+                self.row_counts[by] -= bin(mask).count('1')
+
+    def _simulate_path(self, p_type, x, rot, spin_path):
+        """Follows the placement keypresses from spawn on the current board without modifying the game.
+        Returns (x, y, rot, last_move_rotate) before the drop, or None if a keypress would fail."""
+        px, py, prot = SPAWN_X, SPAWN_Y, ROT_0
+        last_rotate = False
+        if self._check_collision(px, py, prot, p_type):
+            return None
+        
+        # 1. Rotations (shortest direction, like SmartBot)
+        if p_type != MINO_O:
+            turns = (rot - prot) % 4
+            directions = (1, 1) if turns == 2 else (1,) if turns == 1 else (-1,) if turns == 3 else ()
+            for direction in directions:
+                kicked = self._kick_rotation(px, py, prot, p_type, direction)
+                if kicked is None:
+                    return None
+                px, py, prot = kicked
+                last_rotate = True
+        
+        # 2. Horizontal shifts
+        dx = 1 if x > px else -1
+        while px != x:
+            if self._check_collision(px + dx, py, prot, p_type):
+                return None
+            px += dx
+            last_rotate = False
+        
+        # 3. Finishing moves (tucks / spins)
+        for action in spin_path or ():
+            if action == ACTION_LEFT or action == ACTION_RIGHT:
+                step_x = -1 if action == ACTION_LEFT else 1
+                if self._check_collision(px + step_x, py, prot, p_type):
+                    return None
+                px += step_x
+                last_rotate = False
+            elif action == ACTION_DOWN:
+                if self._check_collision(px, py + 1, prot, p_type):
+                    return None
+                py += 1
+            elif action == ACTION_ROTATE_R or action == ACTION_ROTATE_L:
+                if p_type == MINO_O:
+                    continue
+                kicked = self._kick_rotation(px, py, prot, p_type, 1 if action == ACTION_ROTATE_R else -1)
+                if kicked is None:
+                    return None
+                px, py, prot = kicked
+                last_rotate = True
+            else:
+                raise ValueError(f"spin_path only supports movement and rotation actions, got {action}")
+        return (px, py, prot, last_rotate)
+
+    def get_ghost_y(self):
+        ghost_y = self.piece_y
+        while not self._check_collision(self.piece_x, ghost_y + 1, self.piece_rot, self.piece_type):
+            ghost_y += 1
+        return ghost_y
+
+    def step(self, action):
+        if self.game_over or self.in_clear_anim: return
+
+        # Reset rotation flag on HORIZONTAL movement only (not soft drop)
+        if action in [ACTION_LEFT, ACTION_RIGHT]:
+             self.last_move_rotate = False
+        
+        # Action processing
+        if action == ACTION_LEFT:
+            if not self._check_collision(self.piece_x - 1, self.piece_y, self.piece_rot, self.piece_type):
+                self.piece_x -= 1
+        elif action == ACTION_RIGHT:
+            if not self._check_collision(self.piece_x + 1, self.piece_y, self.piece_rot, self.piece_type):
+                self.piece_x += 1
+        elif action == ACTION_DOWN:
+            if not self._check_collision(self.piece_x, self.piece_y + 1, self.piece_rot, self.piece_type):
+                self.piece_y += 1
+        elif action == ACTION_DROP:
+            self._hard_drop()
+            # self.last_move_rotate = False # Drop doesn't count as rotation? Actually hard drop locks immediately
+        elif action == ACTION_ROTATE_R:
+            if self._rotate(1):
+                self.last_move_rotate = True # Mark rotation
+        elif action == ACTION_ROTATE_L:
+            if self._rotate(-1):
+                self.last_move_rotate = True # Mark rotation
+        elif action == ACTION_HOLD:
+            self._hold()
+            self.last_move_rotate = False # Hold resets T-spin status
+
+    def _check_tspin(self):
+        """Returns 0 (None), 1 (Mini), 2 (Normal) based on 3-corner rule."""
+        if self.piece_type != MINO_T or not self.last_move_rotate:
+            return 0
+        
+        # 3-Corner Rule
+        corners = [(0,0), (2,0), (0,2), (2,2)]
+        occupied = 0
+        
+        for dx, dy in corners:
+            ck_x = self.piece_x + dx
+            ck_y = self.piece_y + dy
+            # Check if block exists or out of bounds (walls count as occupied for T-spin)
+            if ck_x < 0 or ck_x >= GRID_WIDTH or ck_y >= TOTAL_HEIGHT:
+                occupied += 1
+            elif ck_y >= 0 and (self.rows[ck_y] >> ck_x) & 1:
+                occupied += 1
+        
+        if occupied >= 3:
+            return 2 # T-Spin Normal
+        return 0
+
+    def _process_garbage(self):
+        """Processes pending garbage and adds it to the bottom of the grid."""
+        if self.garbage_queue <= 0:
+            return
+
+        # Cap garbage per spawn logic...
+        count = self.garbage_queue
+        
+        if self._journal is not None:
+            self._journal.append(('garbage', self.rows[:count], self.colors[:count]))
+        
+        # Hole positions (Puyo Tetris logic: 70% chance to keep the same hole, 30% to change)
+        holes = self.garbage.take(self.garbage_dealt, count)
+        self.garbage_dealt += count
+        
+        # Shift grid up
+        for hole_x in holes:
+            # Check game over if top row has blocks
+            if self.rows[0]:
+                self.game_over = True
+                # Visual effect continues
+            
+            # Remove top row
+            self.rows.pop(0)
+            self.colors.pop(0)
+            
+            # Add garbage row at bottom
+            self.rows.append(FULL_ROW & ~(1 << hole_x))
+            new_row = [8 for _ in range(GRID_WIDTH)] # 8 = Gray
+            new_row[hole_x] = 0 # Hole
+            self.colors.append(new_row)
+            
+        self.garbage_queue = 0 # All processed
+        self._rebuild_stats()
+        self.board_hash = hash_rows(self.rows) # Every row moved
@@ -0,0 +1,164 @@
+# Gymnasium Environment
+# TetrisEnv wraps one TetrisGame. Observations are written into a single
+# preallocated uint8 buffer that is reused every step: the returned arrays are
+# views into it, so they are overwritten by the next step/reset (copy them to keep them).
+# That is deliberate, and the one check of gymnasium's check_env this env does not pass.
+import numpy as np
+import gymnasium as gym
+from gymnasium import spaces
+
+from tetris_core import TetrisGame, GRID_WIDTH, GRID_HEIGHT, TOTAL_HEIGHT
+from piece_tables import MIN_X, MAX_X
+from ai_logic import PREVIEW_SIZE
+
+OBSERVATIONS = ('board', 'heights', 'piece', 'queue', 'hold')
+
+# Placement actions: index = ((use_hold * 4) + rot) * PLACEMENT_COLUMNS + (x - PLACEMENT_X_MIN)
+PLACEMENT_X_MIN = -2 # Lowest piece_x any piece can lock at (I piece, vertical)
+PLACEMENT_COLUMNS = GRID_WIDTH + 1 # piece_x in [-2, 8]
+PLACEMENT_ACTIONS = 2 * 4 * PLACEMENT_COLUMNS
+
+_COLUMN_SHIFTS = np.arange(GRID_WIDTH, dtype=np.uint16)
+
+def _observation_shapes(preview):
+    return {'board': (GRID_HEIGHT, GRID_WIDTH), 'heights': (GRID_WIDTH,),
+            'piece': (1,), 'queue': (preview,), 'hold': (1,)}
+
+def observation_size(observations=OBSERVATIONS, preview=PREVIEW_SIZE):
+    """Length of the flattened observation buffer for these observation modes."""
+    shapes = _observation_shapes(preview)
+    return sum(int(np.prod(shapes[key])) for key in set(observations) & set(OBSERVATIONS))
+
+def decode_placement(action):
+    """Placement action index -> (x, rot, use_hold) for TetrisGame.place."""
+    action = int(action)
+    hold_rot, column = divmod(action, PLACEMENT_COLUMNS)
+    use_hold, rot = divmod(hold_rot, 4)
+    return column + PLACEMENT_X_MIN, rot, bool(use_hold)
+
+def encode_placement(x, rot, use_hold=False):
+    """(x, rot, use_hold) -> placement action index."""
+    return ((int(use_hold) * 4) + rot) * PLACEMENT_COLUMNS + (x - PLACEMENT_X_MIN)
+
+
+class TetrisEnv(gym.Env):
+    """
+    Gymnasium environment over TetrisGame.
+      action_mode  -- 'placement': Discrete(PLACEMENT_ACTIONS), one locked piece per step
+                      via TetrisGame.place (unreachable targets are a no-op, info['invalid']);
+                      'keypress': Discrete(8), one TetrisGame.step action per step.
+      observations -- any of OBSERVATIONS: 'board' (visible 20x10 occupancy), 'heights'
+                      (column heights), 'piece', 'queue' (NEXT pieces), 'hold' (0 = empty).
+      flatten      -- return the whole buffer as one Box instead of a Dict of views.
+      frames_per_step -- gravity frames (TetrisGame.advance) after each keypress step.
+      max_steps    -- truncate episodes after this many steps (None = never).
+      buffer       -- uint8 array of observation_size() to write observations into
+                      (e.g. a row of shared memory, see env_pool); default: a private one.
+    Reward is the score gained. Line clears are resolved within the step.
+    """
+    metadata = {'render_modes': []}
+
+    def __init__(self, action_mode='placement', observations=OBSERVATIONS, flatten=False,
+                 frames_per_step=0, max_steps=None, preview=PREVIEW_SIZE, buffer=None):
+        if action_mode not in ('placement', 'keypress'):
+            raise ValueError(f"unknown action_mode {action_mode!r}")
+        unknown = set(observations) - set(OBSERVATIONS)
+        if unknown:
+            raise ValueError(f"unknown observations {sorted(unknown)}")
+        self.action_mode = action_mode
+        self.frames_per_step = frames_per_step
+        self.max_steps = max_steps
+        self.preview = preview
+        self.flatten = flatten
+        self.game = None
+        self.steps = 0
+
+        # One buffer, one view per observation
+        shapes = _observation_shapes(preview)
+        highs = {'board': 1, 'heights': TOTAL_HEIGHT, 'piece': 7, 'queue': 7, 'hold': 7}
+        self.observation_keys = tuple(key for key in OBSERVATIONS if key in observations)
+        sizes = [int(np.prod(shapes[key])) for key in self.observation_keys]
+        if buffer is None:
+            buffer = np.zeros(sum(sizes), dtype=np.uint8)
+        elif buffer.shape != (sum(sizes),) or buffer.dtype != np.uint8:
+            raise ValueError(f"buffer must be a uint8 array of shape ({sum(sizes)},)")
+        self.buffer = buffer
+        self.views = {}
+        high = np.zeros(sum(sizes), dtype=np.uint8)
+        start = 0
+        for key, size in zip(self.observation_keys, sizes):
+            self.views[key] = self.buffer[start:start + size].reshape(shapes[key])
+            high[start:start + size] = highs[key]
+            start += size
+        self._rows = np.zeros(GRID_HEIGHT, dtype=np.uint16)        # Scratch for the board plane
+        self._bits = np.zeros((GRID_HEIGHT, GRID_WIDTH), dtype=np.uint16)
+
+        if flatten:
+            self.observation_space = spaces.Box(0, high, dtype=np.uint8)
+        else:
+            self.observation_space = spaces.Dict({
+                key: spaces.Box(0, highs[key], shape=shapes[key], dtype=np.uint8)
+                for key in self.observation_keys})
+        if action_mode == 'placement':
+            self.action_space = spaces.Discrete(PLACEMENT_ACTIONS)
+        else:
+            self.action_space = spaces.Discrete(8)
+
+    def _observe(self):
+        game = self.game
+        views = self.views
+        if 'board' in views:
+            self._rows[:] = game.rows[TOTAL_HEIGHT - GRID_HEIGHT:]
+            np.right_shift(self._rows[:, None], _COLUMN_SHIFTS, out=self._bits)
+            np.bitwise_and(self._bits, 1, out=views['board'], casting='unsafe')
+        if 'heights' in views:
+            views['heights'][:] = game.column_heights
+        if 'piece' in views:
+            views['piece'][0] = game.piece_type
+        if 'queue' in views:
+            queue = game.bag[:self.preview]
+            views['queue'][:len(queue)] = queue
+            views['queue'][len(queue):] = 0
+        if 'hold' in views:
+            views['hold'][0] = game.hold_piece or 0
+        return self.buffer if self.flatten else views
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed)
+        # The game seed comes from the env's np_random, so reset(seed=s) is reproducible
+        self.game = TetrisGame(seed=int(self.np_random.integers(0, 1 << 63)))
+        self.steps = 0
+        return self._observe(), {}
+
+    def step(self, action):
+        game = self.game
+        score = game.score
+        info = {}
+        if self.action_mode == 'placement':
+            x, rot, use_hold = decode_placement(action)
+            info['invalid'] = not game.place(x, rot, use_hold)
+        else:
+            game.step(int(action))
+            if self.frames_per_step:
+                game.advance(self.frames_per_step)
+        while game.in_clear_anim:
+            game.update(game.clear_anim_duration)
+        self.steps += 1
+        truncated = self.max_steps is not None and self.steps >= self.max_steps
+        return self._observe(), float(game.score - score), game.game_over, truncated, info
+
+    def action_masks(self):
+        """Boolean mask of the placement actions whose target is inside the walls and reachable."""
+        mask = np.zeros(PLACEMENT_ACTIONS, dtype=bool)
+        game = self.game
+        if game.game_over or self.action_mode != 'placement':
+            return mask
+        options = [(False, game.piece_type)]
+        if not game.hold_used:
+            options.append((True, game.hold_piece if game.hold_piece is not None else game.bag[0]))
+        for use_hold, p_type in options:
+            for rot in range(4):
+                for x in range(MIN_X[p_type][rot], MAX_X[p_type][rot] + 1):
+                    if game._simulate_path(p_type, x, rot, None) is not None:
+                        mask[encode_placement(x, rot, use_hold)] = True
+        return mask
@@ -0,0 +1,175 @@
+# Heuristic Weight Tuning (cross-entropy method)
+# Searches SmartBot's heuristic weights (ai_logic.WEIGHT_NAMES) headless.
+# Every generation samples `population` weight vectors from a Gaussian per
+# weight, plays each of them on the same seeded games in a process pool, and
+# refits the Gaussians to the best `elite` fraction (plus a decaying noise
+# term so the search does not collapse early).
+# Clearly bad candidates are dropped early: games are played in rounds, and
+# after each round only the better half of the remaining candidates (never
+# fewer than the elite) plays on. The best fully evaluated weights so far are
+# written to a JSON config after every generation; SmartBot(weights=path),
+# AIController(weights=path) and `tetris.py --ai-weights path` load it.
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tetris_core import TetrisGame
+from ai_logic import SmartBot, WEIGHT_NAMES
+
+DEFAULT_STD = 0.5 # Initial std, relative to the magnitude of the starting weights
+
+# --- Worker side ---
+
+_bot_options = None
+
+def _init_worker(bot_options):
+    global _bot_options
+    _bot_options = bot_options
+
+def play_game(bot, seed, max_pieces):
+    """Plays one headless game of at most `max_pieces` pieces; returns its score."""
+    game = TetrisGame(seed=seed)
+    for _ in range(max_pieces):
+        if game.game_over:
+            break
+        for action in bot.get_moves(game):
+            game.step(action)
+        while game.in_clear_anim:
+            game.update(game.clear_anim_duration)
+    return game.score
+
+def _evaluate(weights, seed, max_pieces):
+    return play_game(SmartBot(weights=dict(zip(WEIGHT_NAMES, weights)), **_bot_options), seed, max_pieces)
+
+
+class CrossEntropyTuner:
+    """
+    Cross-entropy search over SmartBot weights; fitness is the mean score over `games` seeded games.
+      population -- candidates per generation
+      elite      -- fraction of the population the Gaussians are refitted to
+      games      -- games per candidate per generation (the same seeds for every candidate)
+      rounds     -- rounds the games are split into for early termination (1 = none)
+      max_pieces -- pieces per game at most
+      bot_options -- other SmartBot options (depth, beam_width, use_hold, ...)
+    """
+    def __init__(self, start=None, population=32, elite=0.25, games=16, rounds=4, max_pieces=500,
+                 workers=None, seed=0, noise=1.0, bot_options=None):
+        start = start or SmartBot().get_weights()
+        self.mean = [float(start[name]) for name in WEIGHT_NAMES]
+        self.std = [max(1.0, abs(w)) * DEFAULT_STD for w in self.mean]
+        self.population = population
+        self.elite = max(2, int(population * elite))
+        self.games = games
+        self.rounds = max(1, min(rounds, games))
+        self.max_pieces = max_pieces
+        self.noise = noise # Extra std added to every weight, decays each generation
+        self.bot_options = bot_options or {}
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.generation = 0
+        self.best = None # (fitness, weights dict, generation)
+        self.executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(self.bot_options,))
+        self.games_played = 0
+
+    def sample(self):
+        return [[self.rng.gauss(m, s) for m, s in zip(self.mean, self.std)] for _ in range(self.population)]
+
+    def evaluate(self, candidates):
+        """
+        Mean score of every candidate (None for the ones dropped early), on this
+        generation's seeds. Results do not depend on the order workers finish in.
+        """
+        seeds = [self.seed * 1_000_003 + self.generation * self.games + i for i in range(self.games)]
+        scores = [[] for _ in candidates]
+        alive = list(range(len(candidates)))
+        bounds = [self.games * r // self.rounds for r in range(self.rounds + 1)]
+        for r in range(self.rounds):
+            round_seeds = seeds[bounds[r]:bounds[r + 1]]
+            jobs = [(i, seed) for i in alive for seed in round_seeds]
+            results = self.executor.map(_evaluate, [candidates[i] for i, _ in jobs], [seed for _, seed in jobs],
+                                        [self.max_pieces] * len(jobs), chunksize=max(1, len(jobs) // 64))
+            for (i, _), score in zip(jobs, results):
+                scores[i].append(score)
+            self.games_played += len(jobs)
+            if r < self.rounds - 1:
+                # Early termination: the worse half stops here
+                alive.sort(key=lambda i: (-sum(scores[i]) / len(scores[i]), i))
+                alive = sorted(alive[:max(self.elite, len(alive) // 2)])
+        return [sum(scores[i]) / len(scores[i]) if i in alive else None for i in range(len(candidates))]
+
+    def step(self):
+        """Runs one generation; returns (best fitness of the generation, its weights)."""
+        candidates = self.sample()
+        fitness = self.evaluate(candidates)
+        ranked = sorted((i for i, f in enumerate(fitness) if f is not None), key=lambda i: (-fitness[i], i))
+        elites = [candidates[i] for i in ranked[:self.elite]]
+        n = len(elites)
+        for k in range(len(WEIGHT_NAMES)):
+            values = [e[k] for e in elites]
+            mean = sum(values) / n
+            self.mean[k] = mean
+            self.std[k] = (sum((v - mean) ** 2 for v in values) / n) ** 0.5 + self.noise
+        self.noise *= 0.9
+        top = ranked[0]
+        weights = dict(zip(WEIGHT_NAMES, candidates[top]))
+        if self.best is None or fitness[top] > self.best[0]:
+            self.best = (fitness[top], weights, self.generation)
+        self.generation += 1
+        return fitness[top], weights
+
+    def save(self, path):
+        """Writes the best weights so far as a JSON config for SmartBot (atomically)."""
+        fitness, weights, generation = self.best
+        config = {'weights': weights,
+                  'tuning': {'fitness': fitness, 'generation': generation, 'games': self.games,
+                             'max_pieces': self.max_pieces, 'seed': self.seed, 'bot_options': self.bot_options}}
+        with open(path + '.tmp', 'w') as f:
+            json.dump(config, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    import argparse
+    from ai_logic import load_weights
+    parser = argparse.ArgumentParser(description="Tune SmartBot heuristic weights (cross-entropy method)")
+    parser.add_argument('--out', default='weights.json', help="JSON config the best weights are written to")
+    parser.add_argument('--start', help="start from the weights in this JSON config (default: SmartBot's)")
+    parser.add_argument('--generations', type=int, default=20)
+    parser.add_argument('--population', type=int, default=32)
+    parser.add_argument('--elite', type=float, default=0.25)
+    parser.add_argument('--games', type=int, default=16, help="games per candidate per generation")
+    parser.add_argument('--rounds', type=int, default=4, help="early-termination rounds per generation")
+    parser.add_argument('--max-pieces', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--depth', type=int, default=1, help="SmartBot depth of the tuned bot")
+    parser.add_argument('--beam-width', type=int, default=1)
+    parser.add_argument('--use-hold', action='store_true')
+    args = parser.parse_args()
+
+    start = SmartBot(weights=load_weights(args.start)).get_weights() if args.start else None
+    bot_options = {'depth': args.depth, 'beam_width': args.beam_width, 'use_hold': args.use_hold}
+    with CrossEntropyTuner(start, population=args.population, elite=args.elite, games=args.games,
+                           rounds=args.rounds, max_pieces=args.max_pieces, workers=args.workers,
+                           seed=args.seed, bot_options=bot_options) as tuner:
+        for _ in range(args.generations):
+            t0 = time.perf_counter()
+            fitness, weights = tuner.step()
+            tuner.save(args.out)
+            print(f"gen {tuner.generation - 1:3d}  best {fitness:9.1f}  overall {tuner.best[0]:9.1f}  "
+                  f"{time.perf_counter() - t0:6.1f}s  " + ' '.join(f"{name}={value:.2f}" for name, value in weights.items()))
+    print(f"Best weights written to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+# Vectorized Batch Environment (NumPy)
+# Runs N independent games as stacked arrays and applies one action per game
+# in a single vectorized `step(actions)` call. Rules mirror TetrisGame:
+# SRS kicks (srs_data.SRS_I / SRS_JLSTZ), 3-corner T-spin, attack/score tables,
+# 7-bag, hold and garbage. Line clears are instant (no clear animation) and,
+# like TetrisGame.step, there is no gravity: the caller decides when to drop.
+import numpy as np
+
+from srs_data import *
+from piece_tables import PIECE_TYPES, ROW_MASKS, KICKS_CW, KICKS_CCW
+from tetris_core import (GRID_WIDTH, TOTAL_HEIGHT, SPAWN_X, SPAWN_Y, ACTION_LEFT, ACTION_RIGHT,
+                         ACTION_DOWN, ACTION_DROP, ACTION_ROTATE_R, ACTION_ROTATE_L, ACTION_HOLD)
+
+# --- BITBOARD LAYOUT ---
+# Each row is stored as an int32 with PAD wall columns on both sides:
+# bit (x + PAD) is board column x. Empty rows carry the wall bits, so
+# left/right wall collisions fall out of the same AND as block collisions.
+# PAD=4 covers the furthest test position (I piece at x=-2, shifted and kicked 2 more).
+PAD = 4
+ROW_BITS = GRID_WIDTH + 2 * PAD
+WALL_ROW = ((1 << ROW_BITS) - 1) & ~(((1 << GRID_WIDTH) - 1) << PAD)
+SOLID_ROW = (1 << ROW_BITS) - 1
+FLOOR_ROWS = 4 # Solid rows below the board so pieces can be tested under the floor
+BOARD_MASK = (1 << GRID_WIDTH) - 1
+
+def _build_piece_rows():
+    """(8, 4, 4) local row masks: [piece, rot, local_y], bit lx = local column lx."""
+    table = np.zeros((8, 4, 4), dtype=np.int32)
+    for p_type in PIECE_TYPES:
+        for rot in range(4):
+            for ly, mask in ROW_MASKS[p_type][rot]:
+                table[p_type, rot, ly] = mask
+    return table
+
+def _build_kicks():
+    """(8, 4, 2, 5, 2) kick offsets: [piece, old_rot, dir(0=CW, 1=CCW), test, (dx, dy)]."""
+    kicks = np.zeros((8, 4, 2, 5, 2), dtype=np.int32)
+    for p_type in PIECE_TYPES:
+        if p_type == MINO_O:
+            continue # O never rotates (TetrisGame._rotate returns early)
+        for old_rot in range(4):
+            for d, tests in enumerate((KICKS_CW[p_type][old_rot], KICKS_CCW[p_type][old_rot])):
+                for i in range(5):
+                    kicks[p_type, old_rot, d, i] = tests[min(i, len(tests) - 1)]
+    return kicks
+
+PIECE_ROWS = _build_piece_rows()
+KICKS = _build_kicks()
+
+# T-spin corners of the 3x3 box (3-corner rule, see TetrisGame._check_tspin)
+TSPIN_CORNERS = np.array([(0, 0), (2, 0), (0, 2), (2, 2)], dtype=np.int32)
+
+# Attack / score lookup tables indexed by lines cleared (0-4)
+ATTACK_NORMAL = np.array([0, 0, 1, 2, 4], dtype=np.int32)
+ATTACK_TSPIN_MINI = np.array([0, 0, 1, 0, 0], dtype=np.int32)
+ATTACK_TSPIN = np.array([0, 2, 4, 6, 0], dtype=np.int32)
+SCORE_NORMAL = np.array([0, 100, 300, 500, 800], dtype=np.int64)
+SCORE_TSPIN = np.array([0, 800, 1200, 1600, 0], dtype=np.int64)
+# REN bonus by combo count: 0,1->0, 2,3->1, 4,5->2, 6,7->3, 8,9,10->4, 11+->5
+REN_BONUS = np.array([0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 4, 5], dtype=np.int32)
+
+BAG_CAPACITY = 14
+
+
+class VecTetris:
+    """
+    N Tetris games stepped together.
+    State is held in arrays named after the TetrisGame attributes
+    (piece_type, piece_x, ..., score, combo, back_to_back, game_over).
+    hold_piece uses 0 for "no piece held".
+    """
+    def __init__(self, num_games, seed=None):
+        self.num_games = num_games
+        self.rng = np.random.default_rng(seed)
+
+        n = num_games
+        self._rows = np.empty((n, TOTAL_HEIGHT + FLOOR_ROWS), dtype=np.int32)
+        self.bag = np.zeros((n, BAG_CAPACITY), dtype=np.int8)
+        self.bag_len = np.zeros(n, dtype=np.int32)
+        self.piece_type = np.zeros(n, dtype=np.int32)
+        self.piece_x = np.zeros(n, dtype=np.int32)
+        self.piece_y = np.zeros(n, dtype=np.int32)
+        self.piece_rot = np.zeros(n, dtype=np.int32)
+        self.hold_piece = np.zeros(n, dtype=np.int32)
+        self.hold_used = np.zeros(n, dtype=bool)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.combo = np.zeros(n, dtype=np.int32)
+        self.back_to_back = np.zeros(n, dtype=bool)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.last_move_rotate = np.zeros(n, dtype=bool)
+        self.is_tspin = np.zeros(n, dtype=np.int32)
+        self.garbage_queue = np.zeros(n, dtype=np.int32)
+        self.last_attack = np.zeros(n, dtype=np.int32)
+        self.last_lines = np.zeros(n, dtype=np.int32)
+
+        self.reset()
+
+    # --- Public API ---
+
+    def reset(self, indices=None):
+        """Resets all games, or only the games in `indices` (array of ints or bool mask)."""
+        idx = self._as_indices(indices)
+        self._rows[idx, :TOTAL_HEIGHT] = WALL_ROW
+        self._rows[idx, TOTAL_HEIGHT:] = SOLID_ROW
+        self.bag[idx] = 0
+        self.bag_len[idx] = 0
+        self.hold_piece[idx] = 0
+        self.hold_used[idx] = False
+        self.score[idx] = 0
+        self.combo[idx] = -1
+        self.back_to_back[idx] = False
+        self.game_over[idx] = False
+        self.last_move_rotate[idx] = False
+        self.is_tspin[idx] = 0
+        self.garbage_queue[idx] = 0
+        self.last_attack[idx] = 0
+        self.last_lines[idx] = 0
+        self._fill_bag(idx)
+        self._spawn_piece(idx)
+
+    def step(self, actions):
+        """
+        Applies actions[i] (ACTION_*) to game i. Finished games ignore their action.
+        Returns the score gained by each game during this step (int64 array).
+        """
+        actions = np.asarray(actions)
+        score_before = self.score.copy()
+        self.last_attack[:] = 0
+        self.last_lines[:] = 0
+        live = ~self.game_over
+
+        idx = np.flatnonzero(live & ((actions == ACTION_LEFT) | (actions == ACTION_RIGHT)))
+        if idx.size:
+            dx = np.where(actions[idx] == ACTION_LEFT, -1, 1)
+            self.last_move_rotate[idx] = False
+            self._try_move(idx, dx, 0)
+
+        idx = np.flatnonzero(live & (actions == ACTION_DOWN))
+        if idx.size:
+            self._try_move(idx, 0, 1)
+
+        idx = np.flatnonzero(live & ((actions == ACTION_ROTATE_R) | (actions == ACTION_ROTATE_L)))
+        if idx.size:
+            ok = self._rotate(idx, np.where(actions[idx] == ACTION_ROTATE_R, 0, 1))
+            self.last_move_rotate[idx[ok]] = True
+
+        idx = np.flatnonzero(live & (actions == ACTION_HOLD))
+        if idx.size:
+            self._hold(idx)
+            self.last_move_rotate[idx] = False
+
+        idx = np.flatnonzero(live & (actions == ACTION_DROP))
+        if idx.size:
+            self.piece_y[idx] = self._landing_y(idx)
+            self._lock_piece(idx)
+
+        return self.score - score_before
+
+    def add_garbage(self, lines):
+        """Queues garbage lines per game (scalar or array); applied before the next spawn."""
+        self.garbage_queue += np.asarray(lines, dtype=np.int32)
+
+    def get_ghost_y(self):
+        """Landing row of every current piece."""
+        return self._landing_y(np.arange(self.num_games))
+
+    @property
+    def boards(self):
+        """(N, 40) row bitmasks, bit x = column x (same layout as TetrisGame.rows)."""
+        return (self._rows[:, :TOTAL_HEIGHT] >> PAD) & BOARD_MASK
+
+    def grids(self):
+        """(N, 40, 10) uint8 occupancy planes (1=filled)."""
+        bits = np.arange(GRID_WIDTH, dtype=np.int32)
+        return ((self.boards[:, :, None] >> bits) & 1).astype(np.uint8)
+
+    # --- Internals ---
+
+    def _as_indices(self, indices):
+        if indices is None:
+            return np.arange(self.num_games)
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            return np.flatnonzero(indices)
+        return indices.astype(np.intp)
+
+    def _collides(self, idx, x, y, rot, p_type):
+        """Vectorized TetrisGame._check_collision for games idx."""
+        masks = PIECE_ROWS[p_type, rot] << (x + PAD)[:, None] # (k, 4)
+        ys = y[:, None] + np.arange(4)
+        rows = self._rows[idx[:, None], np.clip(ys, 0, TOTAL_HEIGHT + FLOOR_ROWS - 1)]
+        rows = np.where(ys < 0, WALL_ROW, rows) # Above the grid only the walls exist
+        return ((rows & masks) != 0).any(axis=1) | (x + PAD < 0)
+
+    def _try_move(self, idx, dx, dy):
+        new_x = self.piece_x[idx] + dx
+        new_y = self.piece_y[idx] + dy
+        free = ~self._collides(idx, new_x, new_y, self.piece_rot[idx], self.piece_type[idx])
+        self.piece_x[idx[free]] = new_x[free]
+        self.piece_y[idx[free]] = new_y[free]
+
+    def _rotate(self, idx, direction):
+        """SRS rotation with wall kicks. direction: 0=CW, 1=CCW. Returns success mask."""
+        p_type = self.piece_type[idx]
+        old_rot = self.piece_rot[idx]
+        new_rot = (old_rot + np.where(direction == 0, 1, -1)) % 4
+        tests = KICKS[p_type, old_rot, direction] # (k, 5, 2)
+        success = np.zeros(idx.size, dtype=bool)
+        pending = p_type != MINO_O
+        for i in range(tests.shape[1]):
+            if not pending.any():
+                break
+            sub = np.flatnonzero(pending)
+            test_x = self.piece_x[idx[sub]] + tests[sub, i, 0]
+            test_y = self.piece_y[idx[sub]] + tests[sub, i, 1]
+            free = ~self._collides(idx[sub], test_x, test_y, new_rot[sub], p_type[sub])
+            hit = sub[free]
+            self.piece_x[idx[hit]] = test_x[free]
+            self.piece_y[idx[hit]] = test_y[free]
+            self.piece_rot[idx[hit]] = new_rot[hit]
+            success[hit] = True
+            pending[hit] = False
+        return success
+
+    def _landing_y(self, idx):
+        """Closed-form hard drop: tests every row below the piece at once."""
+        x = self.piece_x[idx]
+        y = self.piece_y[idx]
+        masks = PIECE_ROWS[self.piece_type[idx], self.piece_rot[idx]] << (x + PAD)[:, None] # (k, 4)
+        offsets = np.arange(1, TOTAL_HEIGHT + 1)
+        ys = (y[:, None, None] + offsets[None, :, None] + np.arange(4)[None, None, :]) # (k, 40, 4)
+        rows = self._rows[idx[:, None, None], np.clip(ys, 0, TOTAL_HEIGHT + FLOOR_ROWS - 1)]
+        rows = np.where(ys < 0, WALL_ROW, rows)
+        hits = ((rows & masks[:, None, :]) != 0).any(axis=2) # (k, 40)
+        return y + hits.argmax(axis=1) # First colliding offset - 1 rows can still be fallen
+
+    def _check_tspin(self, idx):
+        """3-corner rule (TetrisGame._check_tspin). Returns 0 or 2 per game."""
+        cand = (self.piece_type[idx] == MINO_T) & self.last_move_rotate[idx]
+        cx = self.piece_x[idx, None] + TSPIN_CORNERS[:, 0]
+        cy = self.piece_y[idx, None] + TSPIN_CORNERS[:, 1]
+        rows = self._rows[idx[:, None], np.clip(cy, 0, TOTAL_HEIGHT + FLOOR_ROWS - 1)]
+        occupied = np.where(cy < 0, (WALL_ROW >> (cx + PAD)) & 1, (rows >> (cx + PAD)) & 1)
+        return np.where(cand & (occupied.sum(axis=1) >= 3), 2, 0)
+
+    def _lock_piece(self, idx):
+        self.is_tspin[idx] = self._check_tspin(idx)
+
+        # Place blocks
+        masks = PIECE_ROWS[self.piece_type[idx], self.piece_rot[idx]] << (self.piece_x[idx] + PAD)[:, None]
+        ys = self.piece_y[idx, None] + np.arange(4)
+        valid = (masks != 0) & (ys >= 0) & (ys < TOTAL_HEIGHT)
+        gi = np.broadcast_to(idx[:, None], ys.shape)[valid]
+        self._rows[gi, ys[valid]] |= masks[valid]
+
+        self._check_and_clear(idx)
+        self._spawn_piece(idx)
+
+    def _check_and_clear(self, idx):
+        """Line clear, scoring and attack (TetrisGame._check_and_start_clear + _finalize_clear)."""
+        board = self._rows[idx, :TOTAL_HEIGHT]
+        full = board == SOLID_ROW
+        count = full.sum(axis=1)
+        tspin = self.is_tspin[idx]
+        cleared = count > 0
+
+        # No lines: combo breaks (a T-Spin Zero scores first)
+        zero = idx[~cleared]
+        tsz = zero[tspin[~cleared] > 0]
+        self.score[tsz] += 400 * (self.combo[tsz] + 1)
+        self.combo[zero] = -1
+        if not cleared.any():
+            return
+
+        sel = np.flatnonzero(cleared)
+        g = idx[sel]
+        count = count[sel]
+        tspin = tspin[sel]
+        full = full[sel]
+        board = board[sel]
+
+        perfect = ((board == WALL_ROW) | full).all(axis=1)
+        self.combo[g] += 1
+        combo = self.combo[g]
+        is_difficult = (count == 4) | (tspin > 0)
+
+        # --- Attack Power ---
+        attacks = np.where(tspin == 2, ATTACK_TSPIN[count],
+                  np.where(tspin == 1, ATTACK_TSPIN_MINI[count], ATTACK_NORMAL[count]))
+        b2b_active = is_difficult & self.back_to_back[g]
+        attacks = attacks + b2b_active + 10 * perfect
+        attacks = attacks + REN_BONUS[np.clip(combo, 0, REN_BONUS.size - 1)]
+        self.last_attack[g] = attacks
+        self.last_lines[g] = count
+
+        # --- Scoring ---
+        base = np.where(tspin > 0, SCORE_TSPIN[count], SCORE_NORMAL[count])
+        score_add = base * (combo + 1)
+        score_add = np.where(b2b_active, (score_add * 3) // 2, score_add)
+        score_add = score_add + 3000 * perfect
+        self.score[g] += score_add
+        self.back_to_back[g] = is_difficult
+
+        # Remove lines: stable sort puts the full rows first (top), then the
+        # remaining rows in their original order; the full rows become empty.
+        order = np.argsort(~full, axis=1, kind='stable')
+        board = np.take_along_axis(board, order, axis=1)
+        board[np.arange(TOTAL_HEIGHT) < count[:, None]] = WALL_ROW
+        self._rows[g, :TOTAL_HEIGHT] = board
+
+    def _fill_bag(self, idx):
+        """Appends a shuffled 7-bag to every game in idx."""
+        perms = np.argsort(self.rng.random((idx.size, 7)), axis=1) + 1
+        cols = self.bag_len[idx, None] + np.arange(7)
+        self.bag[idx[:, None], cols] = perms
+        self.bag_len[idx] += 7
+
+    def _process_garbage(self, idx):
+        """Pushes pending garbage rows in from the bottom (TetrisGame._process_garbage)."""
+        idx = idx[self.garbage_queue[idx] > 0]
+        if not idx.size:
+            return
+        count = np.minimum(self.garbage_queue[idx], TOTAL_HEIGHT)
+        max_count = count.max()
+
+        # Hole columns: random start, then 30% chance to move on each further row
+        holes = np.empty((idx.size, max_count), dtype=np.int32)
+        holes[:, 0] = self.rng.integers(0, GRID_WIDTH, idx.size)
+        for r in range(1, max_count):
+            change = self.rng.random(idx.size) < 0.3
+            holes[:, r] = np.where(change, self.rng.integers(0, GRID_WIDTH, idx.size), holes[:, r - 1])
+        garbage = SOLID_ROW & ~(1 << (holes + PAD))
+
+        board = self._rows[idx, :TOTAL_HEIGHT]
+        # Blocks pushed out of the top end the game
+        pushed_out = (board != WALL_ROW) & (np.arange(TOTAL_HEIGHT) < count[:, None])
+        self.game_over[idx] |= pushed_out.any(axis=1)
+
+        src = np.arange(TOTAL_HEIGHT) + count[:, None]
+        from_board = np.take_along_axis(board, np.minimum(src, TOTAL_HEIGHT - 1), axis=1)
+        from_garbage = np.take_along_axis(garbage, np.clip(src - TOTAL_HEIGHT, 0, max_count - 1), axis=1)
+        self._rows[idx, :TOTAL_HEIGHT] = np.where(src < TOTAL_HEIGHT, from_board, from_garbage)
+        self.garbage_queue[idx] = 0
+
+    def _spawn_piece(self, idx):
+        self._process_garbage(idx)
+
+        low = idx[self.bag_len[idx] < 7]
+        if low.size:
+            self._fill_bag(low)
+
+        self.piece_type[idx] = self.bag[idx, 0]
+        self.bag[idx, :-1] = self.bag[idx, 1:]
+        self.bag[idx, -1] = 0
+        self.bag_len[idx] -= 1
+        self.piece_rot[idx] = ROT_0
+        self.piece_x[idx] = SPAWN_X
+        self.piece_y[idx] = SPAWN_Y
+
+        blocked = self._collides(idx, self.piece_x[idx], self.piece_y[idx], self.piece_rot[idx], self.piece_type[idx])
+        self.game_over[idx[blocked]] = True
+        self.hold_used[idx] = False
+
+    def _hold(self, idx):
+        idx = idx[~self.hold_used[idx]]
+        if not idx.size:
+            return
+        empty = idx[self.hold_piece[idx] == 0]
+        swap = idx[self.hold_piece[idx] != 0]
+
+        self.hold_piece[empty] = self.piece_type[empty]
+        if empty.size:
+            self._spawn_piece(empty)
+
+        self.hold_piece[swap], self.piece_type[swap] = self.piece_type[swap], self.hold_piece[swap].copy()
+        self.piece_x[swap] = SPAWN_X
+        self.piece_y[swap] = SPAWN_Y
+        self.piece_rot[swap] = ROT_0
+
+        self.hold_used[idx] = True
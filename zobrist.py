@@ -0,0 +1,120 @@
+# Zobrist Hashing & Transposition Table
+# A board is hashed as the XOR of one random 64-bit key per (row, row_mask),
+# so locking a piece only touches the rows it lands in, and a line clear or a
+# garbage push only touches the rows that actually moved.
+# Keys are drawn from a fixed seed: hashes are stable across runs and processes.
+import random
+from array import array
+
+from piece_tables import GRID_WIDTH
+
+TOTAL_HEIGHT = 40 # Mirrors tetris_core.TOTAL_HEIGHT (tetris_core imports this module)
+
+SEED = 0x7E7215
+_rng = random.Random(SEED)
+
+
+class _RowKeys(dict):
+    """
+    mask -> key for one row. The 1023 keys of a row are drawn on its first
+    lookup, from a stream seeded by the row, so they do not depend on which
+    rows were used first and importing the module stays cheap.
+    """
+    __slots__ = ('y',)
+
+    def __init__(self, y):
+        super().__init__()
+        self.y = y
+
+    def __missing__(self, mask):
+        keys = array('Q')
+        keys.frombytes(random.Random(SEED * TOTAL_HEIGHT + self.y).randbytes(8 * ((1 << GRID_WIDTH) - 1)))
+        self[0] = 0
+        self.update(zip(range(1, 1 << GRID_WIDTH), keys.tolist()))
+        return dict.__getitem__(self, mask)
+
+
+# ROW_KEYS[y][mask]; the empty row hashes to 0 so empty rows cost nothing
+ROW_KEYS = [_RowKeys(y) for y in range(TOTAL_HEIGHT)]
+# Current piece (index = piece type) and hold slot (index 0 = empty)
+PIECE_KEYS = [0] + [_rng.getrandbits(64) for _ in range(7)]
+HOLD_KEYS = [_rng.getrandbits(64) for _ in range(8)]
+
+def hash_rows(rows):
+    """Zobrist hash of a bitboard (sequence of TOTAL_HEIGHT row masks)."""
+    h = 0
+    for y, row in enumerate(rows):
+        if row:
+            h ^= ROW_KEYS[y][row]
+    return h
+
+def state_hash(board_hash, piece_type, hold_piece):
+    """Combines a board hash with the current piece and the hold slot (None = empty)."""
+    return board_hash ^ PIECE_KEYS[piece_type] ^ HOLD_KEYS[hold_piece or 0]
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results keyed by Zobrist hash.
+    Values that depend on more than the position (e.g. heuristic weights) must
+    fold that into the key; SmartBot XORs in a fingerprint of its weights.
+    Each key maps to one slot (key % size). On a collision the new entry
+    replaces the old one if the old one is from an earlier search
+    (generation) or was searched to a depth no greater than the new one;
+    otherwise the new entry is dropped (depth-preferred, aging replacement).
+    """
+    def __init__(self, size=1 << 16):
+        self.size = size
+        self.keys = [None] * size
+        self.values = [None] * size
+        self.depths = [0] * size
+        self.generations = [0] * size
+        self.generation = 0
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.replacements = 0
+
+    def new_search(self):
+        """Marks older entries as replaceable (call once per move)."""
+        self.generation += 1
+
+    def probe(self, key, depth=0):
+        """Returns the stored value if `key` was searched to at least `depth`, else None."""
+        slot = key % self.size
+        if self.keys[slot] == key and self.depths[slot] >= depth:
+            self.hits += 1
+            return self.values[slot]
+        self.misses += 1
+        return None
+
+    def store(self, key, value, depth=0):
+        """Stores `value` for `key` searched to `depth`, subject to the replacement policy."""
+        slot = key % self.size
+        old_key = self.keys[slot]
+        if old_key is not None and old_key != key:
+            if self.generations[slot] == self.generation and self.depths[slot] > depth:
+                return # Keep the deeper entry from this search
+            self.replacements += 1
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.depths[slot] = depth
+        self.generations[slot] = self.generation
+        self.stores += 1
+
+    def clear(self):
+        """Empties the table and resets the counters."""
+        self.keys = [None] * self.size
+        self.values = [None] * self.size
+        self.depths = [0] * self.size
+        self.generations = [0] * self.size
+        self.hits = self.misses = self.stores = self.replacements = 0
+
+    @property
+    def hit_rate(self):
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+    def __len__(self):
+        return self.size - self.keys.count(None)